@@ -0,0 +1,381 @@
+"""
+Admission control and load shedding
+Per-route concurrency limits, per-client token buckets and early shedding
+so that cheap, critical routes stay fast while expensive AI extras degrade.
+"""
+
+import asyncio
+import heapq
+import hmac
+import itertools
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Priority levels (higher is served first)
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 1
+PRIORITY_HIGH = 2
+PRIORITY_URGENT = 3
+
+PRIORITY_HEADER = b"x-priority"
+DEADLINE_HEADER = b"x-request-timeout-ms"
+TOKEN_HEADER = b"x-admin-token"
+
+# Only callers presenting this token may raise their priority (e.g. dispatcher tools);
+# when unset, nobody can
+ADMISSION_TRUSTED_TOKEN = os.getenv("ADMISSION_TRUSTED_TOKEN", "")
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() != "false"
+
+
+class LoadShedError(Exception):
+    """Raised when work is rejected because capacity is exhausted"""
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `burst`"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now: Optional[float] = None) -> bool:
+        """Take one token if available"""
+        self._refill(now if now is not None else time.monotonic())
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until the next token is available"""
+        return max(0.0, (1 - self.tokens) / self.rate) if self.rate > 0 else 60.0
+
+
+class ClientRateLimiter:
+    """Token bucket per client, with LRU eviction so idle clients don't pile up"""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def allow(self, client_id: str) -> Tuple[bool, float]:
+        """Return (allowed, retry_after_seconds) for one request from a client"""
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self._buckets[client_id] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client_id)
+
+        if bucket.try_take():
+            return True, 0.0
+        return False, bucket.retry_after()
+
+
+class PriorityLimiter:
+    """
+    Concurrency limiter whose waiters are served by priority, then FIFO.
+    Tracks an EWMA of service time so callers can be shed up front when
+    their expected queueing delay already exceeds their deadline.
+    """
+
+    def __init__(self, max_concurrency: int, initial_service_time: float = 0.05):
+        self.max_concurrency = max(1, max_concurrency)
+        self.active = 0
+        self.service_time = initial_service_time
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._waiting_by_priority: Dict[int, int] = {}
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(self._waiting_by_priority.values())
+
+    def estimated_wait(self, priority: int) -> float:
+        """Expected seconds in queue for a new waiter at `priority`"""
+        if self.active < self.max_concurrency and not self.waiting:
+            return 0.0
+        ahead = sum(n for p, n in self._waiting_by_priority.items() if p >= priority)
+        return (ahead + 1) * self.service_time / self.max_concurrency
+
+    def try_acquire(self) -> bool:
+        if self.active < self.max_concurrency and not self.waiting:
+            self.active += 1
+            return True
+        return False
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL, timeout: float = 0.0) -> bool:
+        """Wait up to `timeout` seconds for a slot; returns False if none was granted"""
+        if self.try_acquire():
+            return True
+        if timeout <= 0:
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._seq), future))
+        self._waiting_by_priority[priority] = self._waiting_by_priority.get(priority, 0) + 1
+        try:
+            await asyncio.wait({future}, timeout=timeout)
+        except asyncio.CancelledError:
+            self._abandon(future, priority)
+            raise
+
+        if future.done() and not future.cancelled():
+            return True
+        self._abandon(future, priority)
+        return False
+
+    def _abandon(self, future: asyncio.Future, priority: int):
+        if future.done() and not future.cancelled():
+            # Slot was handed to us just as we gave up; pass it on
+            self._release_slot()
+            return
+        future.cancel()
+        self._waiting_by_priority[priority] -= 1
+
+    def release(self, elapsed: Optional[float] = None):
+        """Release a slot, feeding the observed service time into the EWMA"""
+        if elapsed is not None:
+            self.service_time = 0.8 * self.service_time + 0.2 * elapsed
+        self._release_slot()
+
+    def _release_slot(self):
+        while self._waiters:
+            neg_priority, _, future = heapq.heappop(self._waiters)
+            if future.cancelled():
+                continue
+            self._waiting_by_priority[-neg_priority] -= 1
+            future.set_result(True)  # Slot transfers directly to the waiter
+            return
+        self.active -= 1
+
+
+@dataclass
+class RoutePolicy:
+    """Admission policy for a family of routes"""
+    name: str
+    prefix: str
+    methods: Tuple[str, ...] = ("GET", "POST")
+    exact: bool = False
+    max_concurrency: int = 16
+    max_wait: float = 1.0  # Default deadline for queueing, in seconds
+    priority: int = PRIORITY_NORMAL
+    client_rate: float = 5.0  # Tokens per second per client
+    client_burst: float = 20.0
+    demote_over_rate: bool = False  # Queue over-rate clients at low priority instead of a 429
+
+    def matches(self, method: str, path: str) -> bool:
+        if method not in self.methods:
+            return False
+        return path == self.prefix if self.exact else path.startswith(self.prefix)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+ROUTE_POLICIES: List[RoutePolicy] = [
+    RoutePolicy(
+        name="create-request",
+        prefix="/api/requests",
+        methods=("POST",),
+        exact=True,
+        max_concurrency=_env_int("ADMISSION_REQUESTS_CONCURRENCY", 64),
+        max_wait=_env_float("ADMISSION_REQUESTS_MAX_WAIT", 2.0),
+        priority=PRIORITY_HIGH,
+        client_rate=2.0,
+        client_burst=10.0,
+        # Shelters and outreach kiosks share addresses; a help request is never turned away just for that
+        demote_over_rate=True,
+    ),
+    RoutePolicy(
+        name="resource-search",
+        prefix="/api/resources/search",
+        methods=("POST",),
+        exact=True,
+        max_concurrency=_env_int("ADMISSION_SEARCH_CONCURRENCY", 64),
+        max_wait=_env_float("ADMISSION_SEARCH_MAX_WAIT", 1.0),
+        priority=PRIORITY_HIGH,
+        client_rate=10.0,
+        client_burst=30.0,
+    ),
+    RoutePolicy(
+        name="ai",
+        prefix="/api/ai/",
+        methods=("POST",),
+        max_concurrency=_env_int("ADMISSION_AI_CONCURRENCY", 16),
+        max_wait=_env_float("ADMISSION_AI_MAX_WAIT", 0.5),
+        priority=PRIORITY_LOW,
+        client_rate=2.0,
+        client_burst=5.0,
+    ),
+    RoutePolicy(
+        name="call",
+        prefix="/api/call/initiate",
+        methods=("POST",),
+        exact=True,
+        max_concurrency=_env_int("ADMISSION_CALL_CONCURRENCY", 4),
+        max_wait=_env_float("ADMISSION_CALL_MAX_WAIT", 1.0),
+        priority=PRIORITY_NORMAL,
+        client_rate=0.2,
+        client_burst=2.0,
+    ),
+]
+
+# Shared gate for outbound Gemini calls, used by the AI helpers in main.py
+llm_limiter = PriorityLimiter(_env_int("LLM_MAX_CONCURRENCY", 8), initial_service_time=1.0)
+LLM_MAX_WAIT = _env_float("LLM_MAX_WAIT", 1.0)
+# Optional enrichment on critical routes (tone for a new request) must not hold
+# the route's slot while queueing for Gemini; by default it never waits
+LLM_ENRICHMENT_MAX_WAIT = _env_float("LLM_ENRICHMENT_MAX_WAIT", 0.0)
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _is_trusted(scope) -> bool:
+    token = _header(scope, TOKEN_HEADER)
+    return bool(ADMISSION_TRUSTED_TOKEN and token) and hmac.compare_digest(
+        token.encode("latin-1"), ADMISSION_TRUSTED_TOKEN.encode("latin-1")
+    )
+
+
+def _request_priority(scope, default: int) -> int:
+    """Anyone may lower their priority; raising it requires the trusted token"""
+    value = (_header(scope, PRIORITY_HEADER) or "").lower()
+    if value == "low":
+        return PRIORITY_LOW
+    if value == "urgent" and _is_trusted(scope):
+        return PRIORITY_URGENT
+    return default
+
+
+def _request_deadline(scope, default: float) -> float:
+    """Clients may shorten the policy's deadline, never extend it"""
+    value = _header(scope, DEADLINE_HEADER)
+    if value:
+        try:
+            return min(default, max(0.0, float(value) / 1000))
+        except ValueError:
+            pass
+    return default
+
+
+async def _reject(send, status: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionController:
+    """Limiter and rate-limiter state for a set of route policies"""
+
+    def __init__(self, policies: List[RoutePolicy]):
+        self.policies = policies
+        self.limiters = {p.name: PriorityLimiter(p.max_concurrency) for p in policies}
+        self.rate_limiters = {p.name: ClientRateLimiter(p.client_rate, p.client_burst) for p in policies}
+        self.shed_counts = {p.name: {"rateLimited": 0, "demoted": 0, "shed": 0} for p in policies}
+
+    def match(self, method: str, path: str) -> Optional[RoutePolicy]:
+        return next((p for p in self.policies if p.matches(method, path)), None)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Current limiter state per policy"""
+        return {
+            name: {
+                "active": limiter.active,
+                "waiting": limiter.waiting,
+                "maxConcurrency": limiter.max_concurrency,
+                "serviceTimeMs": round(limiter.service_time * 1000, 2),
+                **self.shed_counts[name],
+            }
+            for name, limiter in self.limiters.items()
+        }
+
+
+admission_controller = AdmissionController(ROUTE_POLICIES)
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying the controller's route policies.
+    Over-rate clients get a fast 429 (or, on routes that demote them, wait
+    behind everyone else at low priority); requests whose expected queueing delay
+    exceeds their deadline (policy default, or a shorter X-Request-Timeout-Ms)
+    get a fast 503. Unmatched routes pass straight through.
+    """
+
+    def __init__(self, app, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        policy = self.controller.match(scope["method"], scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        counts = self.controller.shed_counts[policy.name]
+        client = scope.get("client")
+        client_id = client[0] if client else "unknown"
+        allowed, retry_after = self.controller.rate_limiters[policy.name].allow(client_id)
+        priority = _request_priority(scope, policy.priority)
+        if not allowed:
+            if not policy.demote_over_rate:
+                counts["rateLimited"] += 1
+                await _reject(send, 429, "Rate limit exceeded", retry_after)
+                return
+            counts["demoted"] += 1
+            priority = PRIORITY_LOW
+
+        limiter = self.controller.limiters[policy.name]
+        deadline = _request_deadline(scope, policy.max_wait)
+        expected_wait = limiter.estimated_wait(priority)
+        if expected_wait > deadline or not await limiter.acquire(priority, timeout=deadline):
+            counts["shed"] += 1
+            await _reject(send, 503, "Server busy, please retry", max(expected_wait, limiter.service_time))
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - start)
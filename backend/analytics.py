@@ -0,0 +1,209 @@
+"""
+Streaming demand analytics
+Sliding and tumbling window counts per neighbourhood grid cell and
+category, updated as events arrive. Counters live in fixed-size bucket
+rings, so expired time drops out automatically and each query is O(1).
+"""
+
+import math
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+CELL_SIZE_DEG = float(os.getenv("TRENDS_CELL_SIZE_DEG", "0.01"))  # ~1.1km north-south in SF
+ALL = "*"
+
+
+@dataclass(frozen=True)
+class WindowSpec:
+    name: str
+    seconds: int
+    bucket_seconds: int  # Sliding-window granularity
+
+    @property
+    def buckets(self) -> int:
+        return self.seconds // self.bucket_seconds
+
+
+WINDOWS: List[WindowSpec] = [
+    WindowSpec("5m", 5 * 60, 30),
+    WindowSpec("1h", 60 * 60, 5 * 60),
+    WindowSpec("1d", 24 * 60 * 60, 60 * 60),
+    WindowSpec("7d", 7 * 24 * 60 * 60, 6 * 60 * 60),
+]
+LONGEST_WINDOW = max(w.seconds for w in WINDOWS)
+
+
+class SlidingCounter:
+    """Ring of per-bucket counts covering the last `spec.seconds`, with a running total"""
+
+    __slots__ = ("spec", "counts", "total", "last_bucket")
+
+    def __init__(self, spec: WindowSpec):
+        self.spec = spec
+        self.counts = [0] * spec.buckets
+        self.total = 0
+        self.last_bucket = 0
+
+    def _advance(self, bucket: int):
+        if bucket <= self.last_bucket:
+            return
+        n = len(self.counts)
+        if bucket - self.last_bucket >= n:
+            self.counts = [0] * n
+            self.total = 0
+        else:
+            for b in range(self.last_bucket + 1, bucket + 1):
+                self.total -= self.counts[b % n]
+                self.counts[b % n] = 0
+        self.last_bucket = bucket
+
+    def add(self, at: float, count: int = 1):
+        bucket = int(at // self.spec.bucket_seconds)
+        self._advance(bucket)
+        # Late events still count if their bucket hasn't expired
+        if self.last_bucket - bucket < len(self.counts):
+            self.counts[bucket % len(self.counts)] += count
+            self.total += count
+
+    def value(self, now: float) -> int:
+        self._advance(int(now // self.spec.bucket_seconds))
+        return self.total
+
+
+class TumblingCounter:
+    """Counts for the current aligned window and the one before it"""
+
+    __slots__ = ("seconds", "window", "current", "previous")
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.window = 0
+        self.current = 0
+        self.previous = 0
+
+    def _advance(self, window: int):
+        if window == self.window + 1:
+            self.previous, self.current = self.current, 0
+        elif window > self.window + 1:
+            self.previous, self.current = 0, 0
+        if window > self.window:
+            self.window = window
+
+    def add(self, at: float, count: int = 1):
+        window = int(at // self.seconds)
+        self._advance(window)
+        if window == self.window:
+            self.current += count
+        elif window == self.window - 1:
+            self.previous += count
+
+    def value(self, now: float) -> Tuple[int, int, int]:
+        """(window start epoch seconds, current count, previous window count)"""
+        self._advance(int(now // self.seconds))
+        return self.window * self.seconds, self.current, self.previous
+
+
+class WindowedCounts:
+    """Every window's sliding and tumbling counter for one (cell, category) key"""
+
+    __slots__ = ("sliding", "tumbling", "last_event")
+
+    def __init__(self):
+        self.sliding = [SlidingCounter(spec) for spec in WINDOWS]
+        self.tumbling = [TumblingCounter(spec.seconds) for spec in WINDOWS]
+        self.last_event = 0.0
+
+    def add(self, at: float):
+        for counter in self.sliding:
+            counter.add(at)
+        for counter in self.tumbling:
+            counter.add(at)
+        self.last_event = max(self.last_event, at)
+
+    def snapshot(self, now: float) -> Dict[str, Dict]:
+        result = {}
+        longest = self.sliding[-1].value(now)
+        for spec, sliding, tumbling in zip(WINDOWS, self.sliding, self.tumbling):
+            count = sliding.value(now)
+            start, current, previous = tumbling.value(now)
+            # Expected count for this window at the longest window's average rate
+            expected = longest * spec.seconds / LONGEST_WINDOW
+            result[spec.name] = {
+                "sliding": count,
+                "tumbling": {
+                    "start": datetime.fromtimestamp(start).isoformat(),
+                    "current": current,
+                    "previous": previous,
+                },
+                "vsLongestAverage": round(count / expected, 2) if expected else None,
+            }
+        return result
+
+
+def cell_for(lat: float, lng: float) -> str:
+    """Grid cell id ("row:col") containing a coordinate"""
+    return f"{math.floor(lat / CELL_SIZE_DEG)}:{math.floor(lng / CELL_SIZE_DEG)}"
+
+
+def cell_bounds(cell: str) -> Dict[str, float]:
+    row, col = (int(part) for part in cell.split(":"))
+    return {
+        "south": round(row * CELL_SIZE_DEG, 6),
+        "west": round(col * CELL_SIZE_DEG, 6),
+        "north": round((row + 1) * CELL_SIZE_DEG, 6),
+        "east": round((col + 1) * CELL_SIZE_DEG, 6),
+    }
+
+
+class DemandAggregator:
+    """
+    Windowed counts keyed by (cell, category), plus the (cell, *), (*, category)
+    and (*, *) roll-ups so every query is a single lookup. Keys with no events
+    inside the longest window are pruned periodically.
+    """
+
+    def __init__(self, prune_every: int = 10000):
+        self._counts: Dict[Tuple[str, str], WindowedCounts] = {}
+        self._prune_every = prune_every
+        self._since_prune = 0
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def record(self, lat: float, lng: float, category: str, at: Optional[datetime] = None):
+        now = time.time()
+        timestamp = at.timestamp() if at else now
+        if now - timestamp >= LONGEST_WINDOW:
+            return
+
+        cell = cell_for(lat, lng)
+        category = category.lower()
+        for key in ((cell, category), (cell, ALL), (ALL, category), (ALL, ALL)):
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = WindowedCounts()
+            counts.add(timestamp)
+
+        self._since_prune += 1
+        if self._since_prune >= self._prune_every:
+            self.prune(now)
+
+    def prune(self, now: Optional[float] = None):
+        now = now if now is not None else time.time()
+        self._since_prune = 0
+        expired = [key for key, counts in self._counts.items() if now - counts.last_event >= LONGEST_WINDOW]
+        for key in expired:
+            del self._counts[key]
+
+    def query(self, cell: str = ALL, category: str = ALL) -> Dict[str, Dict]:
+        counts = self._counts.get((cell, category.lower()))
+        if counts is None:
+            counts = WindowedCounts()
+        return counts.snapshot(time.time())
+
+    def clear(self):
+        self._counts.clear()
+        self._since_prune = 0
@@ -0,0 +1,102 @@
+"""
+Micro-batching for LLM calls
+Collects concurrent submissions for a short window (or until a batch is
+full) and hands them to one batch function, resolving each caller's future
+with its own result.
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", "16"))
+LLM_BATCH_WINDOW = float(os.getenv("LLM_BATCH_WINDOW_MS", "10")) / 1000
+LLM_BATCH_MAX_IN_FLIGHT = int(os.getenv("LLM_BATCH_MAX_IN_FLIGHT", os.getenv("LLM_MAX_CONCURRENCY", "8")))
+
+
+class MicroBatcher:
+    """
+    `process_batch` receives the list of submitted items and must return a
+    list of results in the same order. If it raises, every caller in that
+    batch receives the exception.
+
+    At most `max_in_flight` batches run at once. While that many are
+    outstanding, new items keep accumulating (up to `max_batch_size` per
+    batch), so batches grow exactly when the upstream is saturated.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = LLM_BATCH_MAX_SIZE, max_wait: float = LLM_BATCH_WINDOW,
+                 max_in_flight: int = LLM_BATCH_MAX_IN_FLIGHT):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.max_in_flight = max(1, max_in_flight)
+        self.batches = 0
+        self.items = 0
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        self._flush(only_full=True)
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._on_timer)
+        return await future
+
+    def _on_timer(self):
+        self._timer = None
+        self._flush()
+
+    def _flush(self, only_full: bool = False):
+        """Launch pending batches while there is in-flight capacity"""
+        while self._pending and len(self._running) < self.max_in_flight:
+            if only_full and len(self._pending) < self.max_batch_size:
+                return
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            self.batches += 1
+            self.items += len(batch)
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._on_done)
+        if not self._pending and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        # Items that queued up behind a saturated upstream go out now
+        self._flush()
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        try:
+            results = await self.process_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        if len(results) != len(batch):
+            error = ValueError(f"Batch returned {len(results)} results for {len(batch)} items")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "meanBatchSize": round(self.items / self.batches, 2) if self.batches else 0,
+            "maxBatchSize": self.max_batch_size,
+            "inFlight": len(self._running),
+            "pending": len(self._pending),
+            "windowMs": self.max_wait * 1000,
+        }
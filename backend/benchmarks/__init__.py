@@ -0,0 +1,4 @@
+"""
+BridgeAI backend benchmarks and load tests
+Run from the backend directory, e.g. `python -m benchmarks.overload`
+"""
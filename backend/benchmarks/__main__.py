@@ -0,0 +1,58 @@
+"""
+Run the benchmark suite and write machine-readable results
+
+    python -m benchmarks --scale medium --output results/main.json
+    python -m benchmarks.compare results/main.json results/branch.json
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks import e2e, micro
+from benchmarks.common import environment_info
+from benchmarks.datagen import SCALES
+from benchmarks.mock_services import MockServer
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--suite", choices=["all", "micro", "e2e"], default="all")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed-loop e2e workers")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per e2e scenario")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0,
+                        help="Enable a mock Gemini model with this latency (0 = no model, mock fallbacks)")
+    parser.add_argument("--mock-server", action="store_true",
+                        help="Serve the mock model over local HTTP instead of in-process")
+    parser.add_argument("--scenario", action="append", default=[], help="Only run these e2e scenarios")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    results = {
+        "environment": environment_info(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+    }
+    if args.suite in ("all", "micro"):
+        results["micro"] = micro.run(args.scale, args.seed)
+    if args.suite in ("all", "e2e"):
+        options = dict(scale=args.scale, seed=args.seed, concurrency=args.concurrency,
+                       duration=args.duration, scenarios=tuple(args.scenario))
+        if args.mock_server:
+            with MockServer(latency=args.llm_latency_ms / 1000) as server:
+                results["e2e"] = e2e.run(mock_server_url=server.url, **options)
+        else:
+            results["e2e"] = e2e.run(llm_latency=args.llm_latency_ms / 1000, **options)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"📊 Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,88 @@
+"""
+Micro-batching benchmark for LLM tone classification
+Offers open-loop tone classifications at a fixed rate against a mock
+Gemini model, once one-call-per-text (batch size 1, the previous path) and
+once micro-batched, and reports upstream calls per second and latency.
+The LLM admission gate is lifted so both runs measure the real calls
+rather than load-shed fallbacks.
+
+    python -m benchmarks.batching --rate 100 --llm-latency-ms 300
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List
+
+from benchmarks.common import main, quiet, summarize_latencies
+from benchmarks.datagen import DESCRIPTIONS
+from benchmarks.mock_services import MockGeminiModel
+
+TEXTS = [text for texts in DESCRIPTIONS.values() for text in texts]
+
+
+async def _offer(rate: float, duration: float) -> Dict:
+    latencies: List[float] = []
+
+    async def one(text: str):
+        start = time.perf_counter()
+        await main.analyze_tone_with_ai(text)
+        latencies.append(time.perf_counter() - start)
+
+    tasks = []
+    start = time.perf_counter()
+    sent = 0
+    while time.perf_counter() - start < duration:
+        due = int((time.perf_counter() - start) * rate)
+        while sent < due:
+            tasks.append(asyncio.create_task(one(random.choice(TEXTS))))
+            sent += 1
+        await asyncio.sleep(0.001)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    return {"classifications": len(latencies), "elapsed": elapsed, **summarize_latencies(latencies)}
+
+
+def run(rate: float, duration: float, llm_latency: float, per_item_latency: float,
+        batch_size: int, window: float, in_flight: int) -> Dict[str, Dict]:
+    main.set_llm_concurrency(10**6)
+    results = {}
+    for mode, size in (("single", 1), ("batched", batch_size)):
+        model = MockGeminiModel(llm_latency, seed=42, per_item_latency=per_item_latency)
+        main.gemini_model = model
+        # Batch size 1 with unbounded in-flight batches is exactly one upstream call per text
+        main.tone_batcher.__init__(main.classify_tone_batch, max_batch_size=size, max_wait=window,
+                                   max_in_flight=in_flight if size > 1 else 10**6)
+        with quiet():
+            stats = asyncio.run(_offer(rate, duration))
+        elapsed = stats.pop("elapsed")
+        results[mode] = {
+            **stats,
+            "upstreamCalls": model.calls,
+            "upstreamCallsPerSec": round(model.calls / elapsed, 1),
+            "meanBatchSize": main.tone_batcher.stats()["meanBatchSize"],
+        }
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=100.0, help="Tone classifications offered per second")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="Mock latency per upstream call")
+    parser.add_argument("--per-item-ms", type=float, default=5.0, help="Extra mock latency per batched item")
+    parser.add_argument("--batch-size", type=int, default=main.tone_batcher.max_batch_size)
+    parser.add_argument("--window-ms", type=float, default=main.tone_batcher.max_wait * 1000)
+    parser.add_argument("--in-flight", type=int, default=main.tone_batcher.max_in_flight,
+                        help="Maximum concurrent upstream batches")
+    args = parser.parse_args()
+
+    results = run(args.rate, args.duration, args.llm_latency_ms / 1000, args.per_item_ms / 1000,
+                  args.batch_size, args.window_ms / 1000, args.in_flight)
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,62 @@
+"""
+Shared setup for benchmarks
+Importing this module loads the app with external services disabled and
+its startup logging silenced.
+"""
+
+import contextlib
+import io
+import os
+import platform
+import subprocess
+from datetime import datetime
+from typing import Dict, List
+
+# Never hit real services from a benchmark
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["VAPI_API_KEY"] = ""
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the app's per-request print logging"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+with quiet():
+    import main
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds"""
+    return {
+        "p50Ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95Ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99Ms": round(percentile(latencies, 99) * 1000, 3),
+        "maxMs": round(max(latencies, default=0) * 1000, 3),
+    }
+
+
+def environment_info() -> Dict[str, str]:
+    """Metadata recorded with every result file so runs can be compared fairly"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "commit": commit or "unknown",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": datetime.now().isoformat(),
+    }
@@ -0,0 +1,64 @@
+"""
+Compare two benchmark result files and flag regressions
+Exits non-zero when any metric is worse than the baseline by more than
+the threshold, so it can gate CI.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+# Metric name -> True if higher is better
+METRICS = {
+    "bestUs": False,
+    "throughputRps": True,
+    "p50Ms": False,
+    "p99Ms": False,
+}
+
+
+def compare(baseline: Dict, candidate: Dict, threshold: float) -> List[Tuple[str, str, float, float, float, bool]]:
+    """Rows of (benchmark, metric, baseline, candidate, relative change, regressed)"""
+    rows = []
+    for suite in ("micro", "e2e"):
+        for name, base_stats in baseline.get(suite, {}).items():
+            cand_stats = candidate.get(suite, {}).get(name)
+            if not cand_stats:
+                continue
+            for metric, higher_is_better in METRICS.items():
+                if metric not in base_stats or metric not in cand_stats or not base_stats[metric]:
+                    continue
+                base, cand = base_stats[metric], cand_stats[metric]
+                change = (cand - base) / base
+                worse = -change if higher_is_better else change
+                rows.append((f"{suite}.{name}", metric, base, cand, change, worse > threshold))
+    return rows
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative slowdown (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    rows = compare(baseline, candidate, args.threshold)
+    for name, metric, base, cand, change, regressed in rows:
+        flag = "❌ REGRESSION" if regressed else ""
+        print(f"{name:32} {metric:14} {base:12.3f} -> {cand:12.3f}  {change:+7.1%} {flag}")
+
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"\n{regressions} regression(s) over {args.threshold:.0%} threshold")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,232 @@
+"""
+Synthetic city-scale data generator
+Produces seeded, realistic requests, resources, heatmap events and user
+memories for San Francisco at a configurable scale.
+"""
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from ids import MAX_SEQUENCE, MAX_WORKER_ID, SEQUENCE_BITS, compose_id, format_id
+
+# Neighbourhood centres and relative share of requests
+NEIGHBOURHOODS: List[Tuple[str, float, float, float]] = [
+    ("Tenderloin", 37.7847, -122.4145, 0.25),
+    ("Mission", 37.7599, -122.4148, 0.18),
+    ("SoMa", 37.7785, -122.4056, 0.17),
+    ("Civic Center", 37.7793, -122.4193, 0.12),
+    ("Bayview", 37.7296, -122.3892, 0.08),
+    ("Haight-Ashbury", 37.7692, -122.4481, 0.06),
+    ("Castro", 37.7609, -122.4350, 0.05),
+    ("Richmond", 37.7799, -122.4825, 0.05),
+    ("Sunset", 37.7535, -122.4946, 0.04),
+]
+
+CATEGORIES = [("Food", 0.4), ("Shelter", 0.3), ("Medical", 0.2), ("Legal", 0.1)]
+RESOURCE_TYPES = {"Food": "food", "Shelter": "shelter", "Medical": "medical", "Legal": "legal"}
+TONES = [("Calm", 0.5), ("Anxious", 0.35), ("Distressed", 0.15)]
+STATUSES = [("open", 0.45), ("urgent", 0.1), ("assigned", 0.2), ("resolved", 0.25)]
+WEATHER = [(None, 0.7), ("rain", 0.15), ("storm", 0.05), ("extreme cold", 0.07), ("extreme heat", 0.03)]
+HOURS = [
+    ("Mon-Fri 9am-5pm", 0.3),
+    ("Daily 9am-4pm", 0.15),
+    ("Daily 7am-9pm", 0.2),
+    ("24/7", 0.2),
+    ("Tue-Thu 6pm-9pm", 0.1),
+    ("Sat-Sun 10am-2pm", 0.05),
+]
+
+DESCRIPTIONS = {
+    "Food": [
+        "Need food for my family tonight",
+        "Haven't eaten in two days, looking for a hot meal",
+        "Looking for a food pantry near me",
+        "Need groceries, my kids are hungry",
+    ],
+    "Shelter": [
+        "Need a place to sleep tonight, it's freezing",
+        "Looking for a shelter that accepts pets",
+        "Got kicked out and have nowhere to go",
+        "Need a safe bed for me and my partner",
+    ],
+    "Medical": [
+        "My leg is infected and I can't afford a doctor",
+        "Need my diabetes medication refilled",
+        "Feeling really sick and dizzy, need a clinic",
+        "Need mental health support, things are bad",
+    ],
+    "Legal": [
+        "Got a citation for sleeping outside, what do I do",
+        "Landlord locked me out without notice",
+        "Need help applying for benefits",
+        "Need an ID replacement to get a job",
+    ],
+}
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Maria", "James", "Linh", "Omar", "Rosa", "Dee"]
+MEDICAL_NEEDS = ["diabetes", "asthma", "wheelchair access", "mental health", "pregnancy", "HIV care"]
+SERVICES = {
+    "food": ["Hot meals", "Groceries", "Food pantry", "Free dining room"],
+    "shelter": ["Emergency shelter", "Case management", "Pet-friendly", "Family shelter"],
+    "medical": ["Primary care", "Mental health", "Dental", "Wound care"],
+    "legal": ["Legal aid", "Housing advocacy", "Benefits assistance", "ID replacement"],
+}
+
+
+@dataclass(frozen=True)
+class Scale:
+    requests: int
+    resources: int
+    heatmap_events: int
+    users: int
+
+
+SCALES: Dict[str, Scale] = {
+    "tiny": Scale(requests=100, resources=20, heatmap_events=500, users=20),
+    "small": Scale(requests=1_000, resources=100, heatmap_events=5_000, users=200),
+    "medium": Scale(requests=10_000, resources=1_000, heatmap_events=50_000, users=2_000),
+    "city": Scale(requests=100_000, resources=5_000, heatmap_events=500_000, users=20_000),
+}
+
+
+@dataclass
+class Dataset:
+    requests: List[Dict] = field(default_factory=list)
+    resources: List[Dict] = field(default_factory=list)
+    heatmap: List[Dict] = field(default_factory=list)
+    user_memories: Dict[str, Dict] = field(default_factory=dict)
+
+
+def _weighted(rng: random.Random, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def _neighbourhood_weights():
+    return [n[3] for n in NEIGHBOURHOODS]
+
+
+class DataGenerator:
+    """Seeded generator; the same seed and scale always produce the same data"""
+
+    def __init__(self, seed: int = 42, now: Optional[datetime] = None, days: int = 30):
+        self.rng = random.Random(seed)
+        self.now = now or datetime(2025, 1, 15, 18, 0, 0)
+        self.days = days
+
+    def location(self, spread: float = 0.008) -> Dict:
+        name, lat, lng, _ = self.rng.choices(NEIGHBOURHOODS, _neighbourhood_weights())[0]
+        return {
+            "lat": round(self.rng.gauss(lat, spread), 6),
+            "lng": round(self.rng.gauss(lng, spread), 6),
+            "address": f"{self.rng.randint(1, 3000)} {name}, San Francisco, CA",
+        }
+
+    def timestamp(self) -> datetime:
+        """Random time in the window, weighted towards evenings and nights"""
+        day = self.rng.randrange(self.days)
+        hour = int(self.rng.triangular(0, 24, 20)) % 24
+        moment = self.now - timedelta(days=day)
+        moment = moment.replace(hour=hour, minute=self.rng.randrange(60), second=self.rng.randrange(60))
+        return min(moment, self.now)
+
+    def request(self, index: int) -> Dict:
+        category = _weighted(self.rng, CATEGORIES)
+        tone = _weighted(self.rng, TONES)
+        status = _weighted(self.rng, STATUSES)
+        created = self.timestamp()
+        name = "Anonymous" if self.rng.random() < 0.4 else f"{self.rng.choice(FIRST_NAMES)} {chr(65 + index % 26)}."
+        score = 1 + {"Calm": 0, "Anxious": 1, "Distressed": 2}[tone] + (1 if created.hour < 6 or created.hour > 22 else 0)
+        if status == "urgent":
+            score = max(score, 4)
+        return {
+            # Index spread over worker and sequence bits keeps ids unique within a timestamp
+            "id": format_id("req", compose_id(
+                int(created.timestamp() * 1000),
+                worker_id=(index >> SEQUENCE_BITS) & MAX_WORKER_ID,
+                sequence=index & MAX_SEQUENCE,
+            )),
+            "category": category,
+            "description": self.rng.choice(DESCRIPTIONS[category]),
+            "tone": tone,
+            "status": status,
+            "location": self.location(),
+            "name": name,
+            "conversation": [],
+            "memory": [],
+            "timestamp": created.isoformat(),
+            "safetyScore": min(score, 5),
+            "lastFollowUp": None,
+            "followUpScheduled": status == "resolved",
+        }
+
+    def resource(self, index: int) -> Dict:
+        resource_type = RESOURCE_TYPES[_weighted(self.rng, CATEGORIES)]
+        return {
+            "id": f"res-gen-{index}",
+            "type": resource_type,
+            "name": f"{resource_type.title()} Site {index}",
+            "location": self.location(spread=0.015),
+            "phone": f"415-555-{self.rng.randrange(10000):04d}",
+            "hours": _weighted(self.rng, HOURS),
+            "services": self.rng.sample(SERVICES[resource_type], 2),
+        }
+
+    def heatmap_event(self) -> Dict:
+        return {
+            "location": self.location(),
+            "category": _weighted(self.rng, CATEGORIES),
+            "timestamp": self.timestamp().isoformat(),
+            "weather": _weighted(self.rng, WEATHER),
+            "count": 1,
+        }
+
+    def user_memory(self, index: int) -> Dict:
+        user_id = f"user_{index}"
+        return {
+            "userId": user_id,
+            "preferences": {"category": _weighted(self.rng, CATEGORIES)},
+            "medicalNeeds": self.rng.sample(MEDICAL_NEEDS, self.rng.randrange(3)),
+            "safeHours": self.rng.choice([None, "8am-8pm", "after 6pm"]),
+            "pastExperiences": [f"Requested {_weighted(self.rng, CATEGORIES)} assistance" for _ in range(self.rng.randrange(1, 5))],
+            "lastContact": self.timestamp().isoformat(),
+            "successfulResources": [],
+        }
+
+    def dataset(self, scale: Scale) -> Dataset:
+        requests = [self.request(i) for i in range(scale.requests)]
+        # Newest first, matching how create_request inserts
+        requests.sort(key=lambda r: r["timestamp"], reverse=True)
+        memories = [self.user_memory(i) for i in range(scale.users)]
+        return Dataset(
+            requests=requests,
+            resources=[self.resource(i) for i in range(scale.resources)],
+            heatmap=sorted((self.heatmap_event() for _ in range(scale.heatmap_events)), key=lambda e: e["timestamp"]),
+            user_memories={m["userId"]: m for m in memories},
+        )
+
+
+def generate(scale: str = "small", seed: int = 42) -> Dataset:
+    return DataGenerator(seed).dataset(SCALES[scale])
+
+
+def load_into_app(app_module, dataset: Dataset):
+    """Replace the app's in-memory stores with a dataset, keeping derived indexes in sync"""
+    app_module.requests_db[:] = [dict(r) for r in dataset.requests]
+    app_module.resources_db[:] = [dict(r) for r in dataset.resources]
+    app_module.hours_index.clear()
+    app_module.hours_index.update(app_module.build_hours_index(app_module.resources_db))
+    app_module.heatmap_data_db[:] = [dict(e) for e in dataset.heatmap]
+    app_module.user_memory_db.clear()
+    app_module.user_memory_db.update({k: dict(v) for k, v in dataset.user_memories.items()})
+    app_module.demand_trends.clear()
+    for event in app_module.heatmap_data_db:
+        location = event["location"]
+        app_module.demand_trends.record(location["lat"], location["lng"], event["category"],
+                                        datetime.fromisoformat(event["timestamp"]))
+    app_module.triage_queue.__init__()
+    app_module.request_index.clear()
+    for request in app_module.requests_db:
+        app_module.request_index.add(request)
+        app_module.triage_queue.sync(request)
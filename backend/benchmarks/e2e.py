@@ -0,0 +1,119 @@
+"""
+End-to-end throughput and latency against the ASGI app
+Runs closed-loop workers in-process over httpx's ASGI transport, so the
+numbers cover routing, validation, handler work and serialisation but not
+the network (except to the mock Gemini/VAPI server when one is given).
+"""
+
+import asyncio
+import random
+import time
+from datetime import timedelta
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+import admission
+from benchmarks.common import main, quiet, summarize_latencies
+from benchmarks.datagen import DataGenerator, SCALES, load_into_app
+from benchmarks.mock_services import MockGeminiModel, RemoteMockGeminiModel
+
+Scenario = Callable[[httpx.AsyncClient, random.Random], "asyncio.Future"]
+
+
+def build_scenarios(generator: DataGenerator) -> Dict[str, Scenario]:
+    def search(client, rng):
+        return client.post("/api/resources/search", json={
+            "location": generator.location(),
+            "type": rng.choice([None, "food", "shelter", "medical", "legal"]),
+            "limit": 5,
+        })
+
+    def create(client, rng):
+        request = generator.request(rng.randrange(10**6))
+        return client.post("/api/requests", json={
+            "category": request["category"],
+            "description": request["description"],
+            "location": request["location"],
+            "name": request["name"],
+        })
+
+    def stats(client, rng):
+        return client.get("/api/stats")
+
+    def heatmap(client, rng):
+        return client.get("/api/heatmap")
+
+    def initiate_call(client, rng):
+        return client.post("/api/call/initiate", json={"phoneNumber": "+14155550100"})
+
+    def requests_range(client, rng):
+        since = generator.now - timedelta(days=rng.randrange(generator.days), hours=1)
+        return client.get("/api/requests", params={
+            "since": since.isoformat(),
+            "until": (since + timedelta(hours=1)).isoformat(),
+        })
+
+    return {
+        "search_resources": search,
+        "create_request": create,
+        "get_stats": stats,
+        "get_heatmap": heatmap,
+        "get_requests_range": requests_range,
+        "initiate_call": initiate_call,
+    }
+
+
+async def _run_scenario(scenario: Scenario, concurrency: int, duration: float, seed: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60.0) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker(worker_id: int):
+            nonlocal errors
+            rng = random.Random(seed * 1000 + worker_id)
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await scenario(client, rng)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughputRps": round(len(latencies) / elapsed, 1),
+        **summarize_latencies(latencies),
+    }
+
+
+def run(scale: str = "small", seed: int = 42, concurrency: int = 8, duration: float = 3.0,
+        llm_latency: float = 0.0, mock_server_url: str = "", scenarios: Tuple[str, ...] = ()) -> Dict[str, Dict]:
+    """Reload the dataset before each scenario so runs don't see each other's writes"""
+    generator = DataGenerator(seed)
+    dataset = generator.dataset(SCALES[scale])
+    # Admission control would turn a throughput test into a rate-limit test
+    admission.ADMISSION_ENABLED = False
+    if mock_server_url:
+        main.gemini_model = RemoteMockGeminiModel(mock_server_url)
+        # VAPI calls go over HTTP to the mock server, never to the real API
+        main.VAPI_BASE_URL = mock_server_url
+        main.VAPI_API_KEY = "mock-key"
+    else:
+        main.gemini_model = MockGeminiModel(llm_latency, seed=seed) if llm_latency else None
+        main.VAPI_API_KEY = ""  # initiate_call takes the app's own mock path
+
+    results = {}
+    for name, scenario in build_scenarios(generator).items():
+        if scenarios and name not in scenarios:
+            continue
+        load_into_app(main, dataset)
+        with quiet():
+            results[name] = asyncio.run(_run_scenario(scenario, concurrency, duration, seed))
+    return results
@@ -0,0 +1,60 @@
+"""
+Microbenchmarks for the backend helpers
+Each benchmark reports the best-of-N mean time per call, which is the
+most stable statistic for short, CPU-bound functions.
+"""
+
+import random
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.common import main, quiet
+from benchmarks.datagen import DataGenerator, SCALES
+
+
+def _time_per_call(fn: Callable[[], None], number: int, repeat: int) -> Dict[str, float]:
+    with quiet():
+        timings = timeit.repeat(fn, number=number, repeat=repeat)
+    per_call = [t / number for t in timings]
+    return {
+        "bestUs": round(min(per_call) * 1e6, 3),
+        "medianUs": round(sorted(per_call)[len(per_call) // 2] * 1e6, 3),
+        "calls": number * repeat,
+    }
+
+
+def build_cases(scale: str, seed: int) -> List[Tuple[str, Callable[[], None], int]]:
+    """(name, zero-argument callable, calls per timing) for every microbenchmark"""
+    generator = DataGenerator(seed)
+    dataset = generator.dataset(SCALES[scale])
+    rng = random.Random(seed)
+    points = [(r["location"]["lat"], r["location"]["lng"]) for r in dataset.requests[:1000]]
+    requests = dataset.requests[:1000]
+    user_ids = list(dataset.user_memories)[:1000] or ["user_0"]
+    main.user_memory_db.clear()
+    main.user_memory_db.update({k: dict(v) for k, v in dataset.user_memories.items()})
+
+    def distance():
+        lat1, lng1 = rng.choice(points)
+        lat2, lng2 = rng.choice(points)
+        main.calculate_distance(lat1, lng1, lat2, lng2)
+
+    def safety_score():
+        main.calculate_safety_score(rng.choice(requests), rng.choice([None, "storm"]))
+
+    def memory_update():
+        main.update_user_memory(rng.choice(user_ids), {
+            "experience": "Requested Food assistance",
+            "preferences": {"category": "Food"},
+            "medicalNeeds": ["asthma"],
+        })
+
+    return [
+        ("calculate_distance", distance, 20000),
+        ("calculate_safety_score", safety_score, 20000),
+        ("update_user_memory", memory_update, 5000),
+    ]
+
+
+def run(scale: str = "small", seed: int = 42, repeat: int = 5) -> Dict[str, Dict]:
+    return {name: _time_per_call(fn, number, repeat) for name, fn, number in build_cases(scale, seed)}
@@ -0,0 +1,162 @@
+"""
+Local mock Gemini and VAPI services with configurable latency
+Use the in-process MockGeminiModel for pure app benchmarks, or run the
+HTTP server (standalone or via MockServer) to include real network I/O:
+
+    python -m benchmarks.mock_services --port 4100 --latency-ms 200
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+TONES = ["Calm", "Anxious", "Distressed"]
+
+
+class MockResponse:
+    """Mimics the `.text` attribute of a Gemini response"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+def batch_size(prompt: str) -> int:
+    """Number of items in a multi-item prompt (1 for single prompts)"""
+    if "each numbered message" in prompt:
+        return len(re.findall(r"^\d+\. ", prompt, re.MULTILINE))
+    if "each numbered conversation" in prompt:
+        return len(re.findall(r"^### \d+", prompt, re.MULTILINE))
+    return 1
+
+
+def mock_answer(prompt: str, rng: random.Random = random) -> str:
+    """Plausible canned answer for each kind of prompt the app sends"""
+    if "each numbered message" in prompt:
+        return "\n".join(f"{i}: {rng.choice(TONES)}" for i in range(1, batch_size(prompt) + 1))
+    if "each numbered conversation" in prompt:
+        return "\n".join(f"### {i}\n- Needs assistance\n- First interaction" for i in range(1, batch_size(prompt) + 1))
+    if "classify as" in prompt:
+        return rng.choice(TONES)
+    if "key points" in prompt:
+        return "- Needs assistance\n- First interaction"
+    return "I understand you need help. Here are some resources near you."
+
+
+class MockGeminiModel:
+    """
+    In-process stand-in for genai.GenerativeModel with a blocking latency of
+    `latency` per call plus `per_item_latency` per item in a batched prompt.
+    With `capacity`, at most that many calls are served at once and the rest
+    queue, like a provider's concurrency quota.
+    """
+
+    def __init__(self, latency: float = 0.0, seed: Optional[int] = None, per_item_latency: float = 0.0,
+                 capacity: Optional[int] = None):
+        self.latency = latency
+        self.per_item_latency = per_item_latency
+        self.calls = 0
+        self.rng = random.Random(seed)
+        self._capacity = threading.BoundedSemaphore(capacity) if capacity else None
+
+    def generate_content(self, prompt: str) -> MockResponse:
+        self.calls += 1
+        delay = self.latency + self.per_item_latency * batch_size(prompt)
+        if self._capacity:
+            with self._capacity:
+                time.sleep(delay)
+        elif delay:
+            time.sleep(delay)
+        return MockResponse(mock_answer(prompt, self.rng))
+
+
+class RemoteMockGeminiModel:
+    """Stand-in for genai.GenerativeModel that calls the mock server over HTTP"""
+
+    def __init__(self, base_url: str):
+        self.client = httpx.Client(base_url=base_url, timeout=30.0)
+        self.calls = 0
+
+    def generate_content(self, prompt: str) -> MockResponse:
+        self.calls += 1
+        response = self.client.post("/v1beta/models/mock:generateContent", json={
+            "contents": [{"parts": [{"text": prompt}]}]
+        })
+        return MockResponse(response.json()["candidates"][0]["content"]["parts"][0]["text"])
+
+
+def create_mock_app(latency: float = 0.2, jitter: float = 0.0) -> FastAPI:
+    """Mock of the Gemini generateContent and VAPI call endpoints"""
+    app = FastAPI(title="Mock Gemini/VAPI")
+    calls: Dict[str, Dict] = {}
+    app.state.stats = {"gemini": 0, "vapi": 0}
+
+    async def delay():
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+
+    @app.post("/v1beta/models/{model}:generateContent")
+    async def generate_content(model: str, body: Dict):
+        await delay()
+        app.state.stats["gemini"] += 1
+        prompt = " ".join(part.get("text", "") for c in body.get("contents", []) for part in c.get("parts", []))
+        return {"candidates": [{"content": {"parts": [{"text": mock_answer(prompt)}]}}]}
+
+    @app.post("/call/phone")
+    async def create_call(body: Dict):
+        await delay()
+        app.state.stats["vapi"] += 1
+        call_id = str(uuid.uuid4())
+        calls[call_id] = {"id": call_id, "status": "queued", "customer": body.get("customer")}
+        return calls[call_id]
+
+    @app.get("/call/{call_id}")
+    async def get_call(call_id: str):
+        await delay()
+        return calls.get(call_id, {"id": call_id, "status": "ended"})
+
+    return app
+
+
+class MockServer:
+    """Runs the mock app with uvicorn on a background thread"""
+
+    def __init__(self, port: int = 4100, latency: float = 0.2, jitter: float = 0.0):
+        self.port = port
+        self.app = create_mock_app(latency, jitter)
+        self.server = uvicorn.Server(uvicorn.Config(self.app, port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "MockServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=4100)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(create_mock_app(args.latency_ms / 1000, args.jitter_ms / 1000), port=args.port)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,189 @@
+"""
+Overload test for admission control
+Drives the ASGI app in-process at a multiple of its LLM-bound capacity
+with a mock Gemini model (local tone classifier and micro-batching off),
+once with admission control disabled and once enabled (from many client
+addresses, then from a few sharing the same load), and reports status
+counts and latency percentiles per route.
+
+    python -m benchmarks.overload --overload 10 --duration 5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict
+
+import httpx
+
+import admission
+from benchmarks.common import main, percentile, quiet
+from benchmarks.mock_services import MockGeminiModel
+
+
+SF_CENTER = (37.7749, -122.4194)
+
+TRAFFIC_MIX = [
+    # (route name, weight)
+    ("create-request", 0.4),
+    ("resource-search", 0.4),
+    ("analyze-tone", 0.2),
+]
+
+
+def _location() -> Dict:
+    return {
+        "lat": SF_CENTER[0] + random.uniform(-0.03, 0.03),
+        "lng": SF_CENTER[1] + random.uniform(-0.03, 0.03),
+        "address": "Load test, San Francisco, CA",
+    }
+
+
+async def _send(client: httpx.AsyncClient, route: str) -> int:
+    if route == "create-request":
+        response = await client.post("/api/requests", json={
+            "category": random.choice(["Food", "Shelter", "Medical"]),
+            "description": "I need somewhere warm to sleep tonight",
+            "location": _location(),
+        })
+    elif route == "resource-search":
+        response = await client.post("/api/resources/search", json={"location": _location(), "limit": 5})
+    else:
+        response = await client.post("/api/ai/analyze-tone", json={"text": "I am scared and cold"})
+    return response.status_code
+
+
+def _reset_state():
+    del main.requests_db[1:]
+    main.heatmap_data_db.clear()
+    main.user_memory_db.clear()
+    # Fresh limiters so EWMAs and counters don't leak between runs
+    fresh = admission.AdmissionController(admission.ROUTE_POLICIES)
+    admission.admission_controller.limiters = fresh.limiters
+    admission.admission_controller.rate_limiters = fresh.rate_limiters
+    admission.admission_controller.shed_counts = fresh.shed_counts
+    main.llm_limiter.__init__(main.llm_limiter.max_concurrency, initial_service_time=1.0)
+
+
+async def run_load(rate: float, duration: float, clients: int) -> Dict:
+    """Open-loop load: requests arrive at `rate` per second regardless of responses"""
+    pool = [
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app, client=(f"10.0.{i // 250}.{i % 250}", 5000)),
+            base_url="http://loadtest",
+            timeout=60.0,
+        )
+        for i in range(clients)
+    ]
+    results: Dict[str, Dict] = {name: {"latencies": [], "statuses": {}} for name, _ in TRAFFIC_MIX}
+    names = [name for name, _ in TRAFFIC_MIX]
+    weights = [weight for _, weight in TRAFFIC_MIX]
+
+    async def one(route: str, client: httpx.AsyncClient):
+        start = time.perf_counter()
+        try:
+            status = await _send(client, route)
+        except Exception:
+            status = "error"
+        results[route]["latencies"].append(time.perf_counter() - start)
+        results[route]["statuses"][str(status)] = results[route]["statuses"].get(str(status), 0) + 1
+
+    tasks = []
+    start = time.perf_counter()
+    sent = 0
+    while time.perf_counter() - start < duration:
+        due = int((time.perf_counter() - start) * rate)
+        while sent < due:
+            route = random.choices(names, weights)[0]
+            tasks.append(asyncio.create_task(one(route, random.choice(pool))))
+            sent += 1
+        await asyncio.sleep(0.005)
+    await asyncio.gather(*tasks)
+
+    for client in pool:
+        await client.aclose()
+
+    return {
+        route: {
+            "count": len(data["latencies"]),
+            "statuses": data["statuses"],
+            "p50Ms": round(percentile(data["latencies"], 50) * 1000, 1),
+            "p99Ms": round(percentile(data["latencies"], 99) * 1000, 1),
+            "maxMs": round(max(data["latencies"], default=0) * 1000, 1),
+        }
+        for route, data in results.items()
+    }
+
+
+async def main_async(args) -> Dict:
+    # The upstream serves llm_concurrency calls at once; beyond that, calls queue there
+    main.gemini_model = MockGeminiModel(args.llm_latency, capacity=args.llm_concurrency)
+    # Isolate admission control: every tone is its own LLM call, with no
+    # local classifier answering first and no micro-batching
+    main.tone_classifier = None
+    main.tone_batcher.__init__(main.classify_tone_batch, max_batch_size=1, max_in_flight=10**6)
+    # Capacity is bounded by the LLM: tone analysis for create-request and analyze-tone
+    llm_share = sum(w for name, w in TRAFFIC_MIX if name != "resource-search")
+    capacity = main.llm_limiter.max_concurrency / args.llm_latency / llm_share
+    rate = capacity * args.overload
+
+    report = {"capacityRps": round(capacity, 1), "offeredRps": round(rate, 1), "runs": {}}
+    runs = [
+        ("baseline", False, args.clients),
+        ("admission", True, args.clients),
+        # Few addresses (NAT, shelter kiosks) each far over the per-client rate
+        (f"admission-{args.few_clients}-clients", True, args.few_clients),
+    ]
+    for name, enabled, clients in runs:
+        _reset_state()
+        admission.ADMISSION_ENABLED = enabled
+        # Without admission control the gate is effectively unbounded
+        main.set_llm_concurrency(args.llm_concurrency if enabled else 10**6)
+        # The app logs every request; keep the report readable
+        with quiet():
+            result = await run_load(rate, args.duration, clients)
+        report["runs"][name] = result
+    # Critical routes must stay up under admission control; only AI extras degrade.
+    # Anything but a 200 (429, 503, error) counts as shed
+    report["createsShed"] = sum(
+        count
+        for name, enabled, _ in runs if enabled
+        for status, count in report["runs"][name]["create-request"]["statuses"].items() if status != "200"
+    )
+    return report
+
+
+def _print_report(report: Dict):
+    print(f"\n📈 Capacity ~{report['capacityRps']} rps, offered {report['offeredRps']} rps")
+    for run, routes in report["runs"].items():
+        print(f"\n{run}")
+        for route, stats in routes.items():
+            print(f"  {route:16} n={stats['count']:5}  p50={stats['p50Ms']:8.1f}ms  "
+                  f"p99={stats['p99Ms']:8.1f}ms  statuses={stats['statuses']}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--overload", type=float, default=10.0, help="Offered load as a multiple of capacity")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of offered load per run")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Mock Gemini latency in seconds")
+    parser.add_argument("--llm-concurrency", type=int, default=main.llm_limiter.max_concurrency)
+    parser.add_argument("--clients", type=int, default=1000, help="Distinct client addresses")
+    parser.add_argument("--few-clients", type=int, default=20, help="Client addresses for the shared-address run")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+    main.set_llm_concurrency(args.llm_concurrency)
+
+    report = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    if report["createsShed"]:
+        raise SystemExit(f"❌ {report['createsShed']} create-request calls were shed under admission control")
+
+
+if __name__ == "__main__":
+    main_cli()
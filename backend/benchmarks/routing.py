@@ -0,0 +1,135 @@
+"""
+Walking-time ranking benchmark
+Generates a synthetic San Francisco street grid as an OSM extract (a
+freeway that can only be crossed every few blocks, and a hill tagged with
+elevations), preprocesses it with routing.py, memory-maps the result and
+times search re-ranking. Also reports how often walking time changes the
+top results compared with straight-line distance.
+
+    python -m benchmarks.routing --block-m 100 --queries 200
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.common import main, quiet, summarize_latencies
+from benchmarks.datagen import DataGenerator
+
+import routing
+
+SOUTH, WEST, NORTH, EAST = 37.708, -122.510, 37.810, -122.370
+FREEWAY_LNG = -122.405  # Roughly US-101 through SoMa/Mission
+FREEWAY_CROSSING_EVERY = 12  # Blocks between over/underpasses
+HILL = (37.7544, -122.4477, 280.0, 1200.0)  # Twin Peaks: lat, lng, height m, radius m
+
+
+def _elevation(lat: float, lng: float) -> float:
+    hill_lat, hill_lng, height, radius = HILL
+    d = routing.haversine_m(lat, lng, hill_lat, hill_lng)
+    return height * math.exp(-(d * d) / (2 * radius * radius))
+
+
+def write_synthetic_osm(path: str, block_m: float) -> Dict[str, int]:
+    """Street grid with one partially crossable barrier and elevations"""
+    lat_step = block_m / 111320
+    lng_step = block_m / (111320 * math.cos(math.radians((SOUTH + NORTH) / 2)))
+    rows = int((NORTH - SOUTH) / lat_step) + 1
+    cols = int((EAST - WEST) / lng_step) + 1
+    barrier_col = int((FREEWAY_LNG - WEST) / lng_step)
+
+    def node_id(r: int, c: int) -> int:
+        return r * cols + c + 1
+
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<osm version="0.6">\n')
+        for r in range(rows):
+            for c in range(cols):
+                lat, lng = SOUTH + r * lat_step, WEST + c * lng_step
+                f.write(f'<node id="{node_id(r, c)}" lat="{lat:.7f}" lon="{lng:.7f}">'
+                        f'<tag k="ele" v="{_elevation(lat, lng):.1f}"/></node>\n')
+        way_id = 1
+        for r in range(rows):
+            for c in range(cols - 1):
+                # East-west streets stop at the freeway except at crossings
+                walkable = c != barrier_col or r % FREEWAY_CROSSING_EVERY == 0
+                highway = "residential" if walkable else "motorway"
+                f.write(f'<way id="{way_id}"><nd ref="{node_id(r, c)}"/><nd ref="{node_id(r, c + 1)}"/>'
+                        f'<tag k="highway" v="{highway}"/></way>\n')
+                way_id += 1
+        for c in range(cols):
+            f.write(f'<way id="{way_id}">' + "".join(f'<nd ref="{node_id(r, c)}"/>' for r in range(rows))
+                    + '<tag k="highway" v="residential"/></way>\n')
+            way_id += 1
+        f.write("</osm>\n")
+    ways = way_id - 1
+    return {"rows": rows, "cols": cols, "ways": ways}
+
+
+def run(block_m: float, landmarks: int, resources: int, queries: int, limit: int, seed: int = 42) -> Dict:
+    generator = DataGenerator(seed=seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        osm_path = os.path.join(tmp, "synthetic.osm")
+        graph_path = os.path.join(tmp, "synthetic.graph")
+        grid = write_synthetic_osm(osm_path, block_m)
+
+        start = time.perf_counter()
+        nodes, ways = routing.parse_osm(osm_path)
+        stats = routing.build_graph(nodes, ways, graph_path, landmarks)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        graph = routing.WalkingGraph(graph_path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        main.walking_graph = graph
+        main.resources_db[:] = [generator.resource(i) for i in range(resources)]
+        main.hours_index = main.build_hours_index(main.resources_db)
+
+        latencies: List[float] = []
+        changed = 0
+        for _ in range(queries):
+            origin = generator.location(spread=0.02)
+            request = main.ResourceSearchRequest(location=origin, limit=limit)
+            baseline = main.ResourceSearchRequest(location=origin, limit=limit, walking=False)
+            with quiet():
+                started = time.perf_counter()
+                ranked = asyncio.run(main.search_resources(request))["resources"]
+                latencies.append(time.perf_counter() - started)
+                straight = asyncio.run(main.search_resources(baseline))["resources"]
+            if [r["id"] for r in ranked] != [r["id"] for r in straight]:
+                changed += 1
+
+        result = {
+            "grid": grid,
+            "graph": stats,
+            "graphFileBytes": os.path.getsize(graph_path),
+            "buildSeconds": round(build_seconds, 2),
+            "mmapLoadMs": round(load_ms, 3),
+            "search": summarize_latencies(latencies),
+            "topResultsChangedPct": round(100 * changed / queries, 1),
+        }
+        main.walking_graph = None
+        return result
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--block-m", type=float, default=100.0, help="Street grid spacing in metres")
+    parser.add_argument("--landmarks", type=int, default=8)
+    parser.add_argument("--resources", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.block_m, args.landmarks, args.resources, args.queries, args.limit)
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
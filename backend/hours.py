@@ -0,0 +1,234 @@
+"""
+Opening hours index
+Free-text resource hours ("Mon-Fri 9am-5pm", "9am-5pm Mon-Fri", "Daily
+7am-9pm, closed Sun", "24/7") are parsed once into weekly bitmaps of 5-minute
+slots, so "is it open at t?" is a single bit test and the next opening/closing
+time is a bit scan. Hours mentioning days the parser can't place are treated
+as unparseable rather than guessed.
+"""
+
+import os
+import re
+from datetime import datetime, timedelta, tzinfo
+from typing import Dict, List, Optional
+
+try:
+    from zoneinfo import ZoneInfo
+    RESOURCE_TIMEZONE: Optional[tzinfo] = ZoneInfo(os.getenv("RESOURCE_TIMEZONE", "America/Los_Angeles"))
+except Exception:
+    RESOURCE_TIMEZONE = None  # Fall back to server local time
+
+SLOT_MINUTES = 5
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+SLOTS_PER_WEEK = MINUTES_PER_WEEK // SLOT_MINUTES
+FULL_WEEK = (1 << SLOTS_PER_WEEK) - 1
+
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+_DAY = r"(?:mon|tue|wed|thu|fri|sat|sun)[a-z]*\.?"
+_DAYS = rf"(?:daily|every\s*day|weekdays|weekends|{_DAY}(?:\s*(?:-|–|to|,|&|and)\s*{_DAY})*)"
+_TIME = r"(?:\d{1,2}(?::\d{2})?\s*(?:am|pm|a\.m\.|p\.m\.)?|noon|midnight)"
+_RANGE_RE = re.compile(
+    rf"(?P<days>{_DAYS})?\s*:?\s*(?:(?P<allday>24\s*(?:hours|hrs|h))|(?P<start>{_TIME})\s*(?:-|–|to)\s*(?P<end>{_TIME}))"
+)
+_ALWAYS_RE = re.compile(r"^\s*(?:24/7|24\s*hours|open\s*24\s*(?:hours|/7)?|always\s*open)\s*$")
+# Days written after a range ("9am-5pm Mon-Fri") and explicitly closed days ("closed Sun")
+_TRAILING_DAYS_RE = re.compile(rf"\s*,?\s*(?:on\s+)?(?P<days>{_DAYS})")
+_CLOSED_RE = re.compile(rf"closed\s*(?:on\s+)?(?P<days>{_DAYS})")
+_DAY_WORD_RE = re.compile(
+    r"\b(?:(?:mon|tues?|wed(?:nes)?|thu(?:rs?)?|fri|sat(?:ur)?|sun)(?:day)?s?|daily|every\s*day|weekdays|weekends)\b"
+)
+
+
+def _parse_days(text: Optional[str]) -> Optional[List[int]]:
+    if not text:
+        return None
+    text = text.strip()
+    if text in ("daily",) or text.replace(" ", "") == "everyday":
+        return list(range(7))
+    if text == "weekdays":
+        return list(range(5))
+    if text == "weekends":
+        return [5, 6]
+
+    days: List[int] = []
+    for part in re.split(r"\s*(?:,|&|and)\s*", text):
+        bounds = re.split(r"\s*(?:-|–|to)\s*", part)
+        indexes = [DAYS.index(b[:3]) for b in bounds if b[:3] in DAYS]
+        if len(indexes) == 1:
+            days.append(indexes[0])
+        elif len(indexes) == 2:
+            first, last = indexes
+            days.extend((first + i) % 7 for i in range((last - first) % 7 + 1))
+    return sorted(set(days)) or None
+
+
+def _parse_time(text: str, default_suffix: Optional[str] = None) -> Optional[int]:
+    """Minutes after midnight; bare hours take `default_suffix` (am/pm) if given"""
+    text = text.strip().replace(".", "")
+    if text == "noon":
+        return 12 * 60
+    if text == "midnight":
+        return 0
+    match = re.match(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?$", text)
+    if not match:
+        return None
+    hour, minute, suffix = int(match.group(1)), int(match.group(2) or 0), match.group(3) or default_suffix
+    if suffix == "pm" and hour != 12:
+        hour += 12
+    elif suffix == "am" and hour == 12:
+        hour = 0
+    if hour > 24 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def _suffix(text: str) -> Optional[str]:
+    match = re.search(r"(am|pm|a\.m\.|p\.m\.)$", text.strip())
+    return match.group(1).replace(".", "") if match else None
+
+
+def _set_minutes(mask: int, start: int, end: int) -> int:
+    """Set the slots covering [start, end) minutes-of-week, wrapping past Sunday"""
+    first = start // SLOT_MINUTES
+    last = -(-end // SLOT_MINUTES)  # Round partial slots up to open
+    if last <= SLOTS_PER_WEEK:
+        return mask | (((1 << (last - first)) - 1) << first)
+    mask |= ((1 << (SLOTS_PER_WEEK - first)) - 1) << first
+    return mask | ((1 << (last - SLOTS_PER_WEEK)) - 1)
+
+
+class WeeklySchedule:
+    """Opening hours as a bitmap of 5-minute slots from Monday 00:00"""
+
+    __slots__ = ("mask",)
+
+    def __init__(self, mask: int = 0):
+        self.mask = mask & FULL_WEEK
+
+    @property
+    def always_open(self) -> bool:
+        return self.mask == FULL_WEEK
+
+    @staticmethod
+    def _minute_of_week(moment: datetime) -> int:
+        return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+    def is_open(self, moment: datetime) -> bool:
+        slot = self._minute_of_week(moment) // SLOT_MINUTES
+        return bool((self.mask >> slot) & 1)
+
+    def _next_change(self, moment: datetime, opening: bool) -> Optional[datetime]:
+        """Next time the place opens (or closes), scanning at most one week ahead"""
+        if self.mask in (0, FULL_WEEK):
+            return None
+        minute = self._minute_of_week(moment)
+        slot = minute // SLOT_MINUTES
+        rotated = ((self.mask >> slot) | (self.mask << (SLOTS_PER_WEEK - slot))) & FULL_WEEK
+        target = rotated if opening else ~rotated & FULL_WEEK
+        target &= ~1  # The current slot doesn't count as a change
+        if not target:
+            return None
+        offset = (target & -target).bit_length() - 1
+        ahead = offset * SLOT_MINUTES - minute % SLOT_MINUTES
+        return (moment + timedelta(minutes=ahead)).replace(second=0, microsecond=0)
+
+    def next_open(self, moment: datetime) -> Optional[datetime]:
+        return None if self.is_open(moment) else self._next_change(moment, opening=True)
+
+    def next_close(self, moment: datetime) -> Optional[datetime]:
+        return self._next_change(moment, opening=False) if self.is_open(moment) else None
+
+
+def parse_hours(hours: Optional[str]) -> Optional[WeeklySchedule]:
+    """Parse free-text hours; None if nothing recognisable was found"""
+    if not hours:
+        return None
+    text = hours.lower()
+    if _ALWAYS_RE.match(text):
+        return WeeklySchedule(FULL_WEEK)
+
+    matches = list(_RANGE_RE.finditer(text))
+    if not matches:
+        return None
+    consumed = [match.span() for match in matches]
+    closed = set()
+    for match in _CLOSED_RE.finditer(text):
+        closed.update(_parse_days(match.group("days")) or [])
+        consumed.append(match.span())
+
+    # Each range's own days come before its times or, failing that, right after them
+    own_days: List[Optional[List[int]]] = []
+    trailing: List[bool] = []
+    for i, match in enumerate(matches):
+        days = _parse_days(match.group("days"))
+        after = None
+        if days is None:
+            gap_end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            after = _TRAILING_DAYS_RE.match(text, match.end(), gap_end)
+        if after:
+            days = _parse_days(after.group("days"))
+            consumed.append(after.span())
+        own_days.append(days)
+        trailing.append(bool(after))
+
+    # Day words nothing accounted for would silently widen a range to every day
+    leftover = list(text)
+    for start, end in consumed:
+        leftover[start:end] = " " * (end - start)
+    if _DAY_WORD_RE.search("".join(leftover)):
+        return None
+
+    # A range without days shares trailing days written after the next
+    # range ("9am-12pm, 1pm-5pm Mon-Fri"), else reuses the previous days (or every day)
+    for i in reversed(range(len(matches) - 1)):
+        if own_days[i] is None and trailing[i + 1]:
+            own_days[i], trailing[i] = own_days[i + 1], True
+
+    mask = 0
+    days = None
+    found = False
+    for match, match_days in zip(matches, own_days):
+        days = match_days or days or list(range(7))
+        if match.group("allday"):
+            start, end = 0, MINUTES_PER_DAY
+        else:
+            end_text = match.group("end")
+            end = _parse_time(end_text)
+            end_suffix = _suffix(end_text)
+            start = _parse_time(match.group("start"))
+            if _suffix(match.group("start")) is None and end_suffix:
+                with_suffix = _parse_time(match.group("start"), end_suffix)
+                if with_suffix is not None and end is not None and with_suffix < end:
+                    start = with_suffix
+            if start is None or end is None:
+                continue
+            if end_suffix is None and end <= start < end + 12 * 60 and end < 12 * 60:
+                end += 12 * 60  # "9-5" and "9am-5" mean 5pm, not overnight; "22-6" stays overnight
+            if end == 0 or end <= start:
+                end += MINUTES_PER_DAY  # Overnight, e.g. 8pm-7am or 6pm-midnight
+        for day in days:
+            if day not in closed:
+                mask = _set_minutes(mask, day * MINUTES_PER_DAY + start, day * MINUTES_PER_DAY + end)
+        found = True
+    return WeeklySchedule(mask) if found else None
+
+
+def localize(moment: Optional[datetime] = None) -> datetime:
+    """A time in the resources' timezone; naive inputs are taken to already be local to them"""
+    if moment is None:
+        return datetime.now(RESOURCE_TIMEZONE)
+    if moment.tzinfo is None or RESOURCE_TIMEZONE is None:
+        return moment
+    return moment.astimezone(RESOURCE_TIMEZONE)
+
+
+def build_hours_index(resources: List[Dict]) -> Dict[str, Optional[WeeklySchedule]]:
+    """Resource id -> parsed schedule (None when hours are missing or unparseable)"""
+    index = {}
+    for resource in resources:
+        schedule = parse_hours(resource.get("hours"))
+        if schedule is None and resource.get("hours"):
+            print(f"⚠️ Could not parse hours for {resource['id']}: {resource['hours']!r}")
+        index[resource["id"]] = schedule
+    return index
@@ -0,0 +1,196 @@
+"""
+Time-sortable request IDs
+Snowflake-style 63-bit ids: milliseconds since EPOCH_MS, a worker id and a
+per-millisecond sequence. Rendered as fixed-width decimals, so string order
+matches creation order and time ranges map to id ranges.
+"""
+
+import bisect
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+TIMESTAMP_SHIFT = WORKER_BITS + SEQUENCE_BITS
+ID_DIGITS = 19  # Enough for any 63-bit value
+
+WORKER_ID_LOCK_DIR = os.getenv("WORKER_ID_LOCK_DIR", os.path.join(tempfile.gettempdir(), "bridgeai-worker-ids"))
+
+_claimed: Dict[int, int] = {}  # pid -> worker id, so forked children claim their own
+_lock_files: List = []
+
+
+def claim_worker_id() -> int:
+    """
+    This process's worker id. WORKER_ID wins when set (it must be unique across
+    hosts sharing a datastore). Otherwise the first free id is claimed with an
+    exclusive flock on a per-id lock file. The lock is released when the process
+    exits, so ids are unique among live workers on this host and never go stale.
+    """
+    pid = os.getpid()
+    if pid in _claimed:
+        return _claimed[pid]
+    configured = os.getenv("WORKER_ID")
+    if configured is not None:
+        worker_id = int(configured)
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"WORKER_ID must be between 0 and {MAX_WORKER_ID}")
+    else:
+        worker_id = _lock_free_worker_id()
+    _claimed[pid] = worker_id
+    return worker_id
+
+
+def _lock_free_worker_id() -> int:
+    try:
+        import fcntl
+    except ImportError:
+        raise RuntimeError("Set WORKER_ID: worker ids can't be claimed automatically on this platform")
+    os.makedirs(WORKER_ID_LOCK_DIR, exist_ok=True)
+    for worker_id in range(MAX_WORKER_ID + 1):
+        handle = open(os.path.join(WORKER_ID_LOCK_DIR, f"{worker_id}.lock"), "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            continue
+        _lock_files.append(handle)  # Held open for the life of the process
+        return worker_id
+    raise RuntimeError(f"All {MAX_WORKER_ID + 1} worker ids are in use; set WORKER_ID explicitly")
+
+
+class SnowflakeGenerator:
+    """
+    Monotonic id generator; never repeats even if the wall clock steps back.
+    Without an explicit worker_id, the process's claimed id is used (and
+    re-claimed in a forked child).
+    """
+
+    def __init__(self, worker_id: Optional[int] = None):
+        if worker_id is not None and not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self._fixed_worker_id = worker_id
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    @property
+    def worker_id(self) -> int:
+        return self._fixed_worker_id if self._fixed_worker_id is not None else claim_worker_id()
+
+    def next_id(self) -> int:
+        with self._lock:
+            now_ms = max(int(time.time() * 1000), self._last_ms)
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Sequence exhausted for this millisecond; borrow the next one
+                    now_ms += 1
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+            return compose_id(now_ms, self.worker_id, self._sequence)
+
+
+def compose_id(timestamp_ms: int, worker_id: int = 0, sequence: int = 0) -> int:
+    return ((timestamp_ms - EPOCH_MS) << TIMESTAMP_SHIFT) | (worker_id << SEQUENCE_BITS) | sequence
+
+
+def format_id(prefix: str, value: int) -> str:
+    return f"{prefix}-{value:0{ID_DIGITS}d}"
+
+
+def parse_id(request_id: str) -> Optional[int]:
+    """Numeric id, or None for ids not produced by this scheme (e.g. legacy "req-1")"""
+    _, _, digits = request_id.rpartition("-")
+    if len(digits) != ID_DIGITS or not digits.isdigit():
+        return None
+    return int(digits)
+
+
+def id_timestamp_ms(value: int) -> int:
+    return (value >> TIMESTAMP_SHIFT) + EPOCH_MS
+
+
+def _as_aware(moment: datetime) -> datetime:
+    """Naive datetimes (as request timestamps are stored) are taken as server-local time"""
+    return moment if moment.tzinfo is not None else moment.astimezone()
+
+
+def _to_ms(moment: datetime) -> int:
+    return int(_as_aware(moment).timestamp() * 1000)
+
+
+class TimeOrderedIndex:
+    """
+    Requests by id, plus their ids in sorted order for time-range queries.
+    New ids are monotonic, so inserts are appends; range lookups are two
+    binary searches. Legacy ids without a timestamp are kept aside, sorted
+    by their `timestamp` field, and merged in only when they match.
+    """
+
+    def __init__(self):
+        self._sorted_ids: List[int] = []
+        self._by_number: Dict[int, Dict] = {}
+        self._by_id: Dict[str, Dict] = {}
+        self._legacy: List[Dict] = []
+        self._legacy_ms: List[int] = []  # Parallel to _legacy, ascending
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def add(self, request: Dict):
+        request_id = request["id"]
+        if request_id in self._by_id:
+            return
+        self._by_id[request_id] = request
+        number = parse_id(request_id)
+        if number is None:
+            # Parsed once here; bisect_left keeps ties in insertion order when read newest-first
+            created_ms = _to_ms(datetime.fromisoformat(request["timestamp"]))
+            position = bisect.bisect_left(self._legacy_ms, created_ms)
+            self._legacy_ms.insert(position, created_ms)
+            self._legacy.insert(position, request)
+            return
+        self._by_number[number] = request
+        if not self._sorted_ids or number > self._sorted_ids[-1]:
+            self._sorted_ids.append(number)
+        else:
+            bisect.insort(self._sorted_ids, number)
+
+    def get(self, request_id: str) -> Optional[Dict]:
+        return self._by_id.get(request_id)
+
+    def clear(self):
+        self.__init__()
+
+    def range(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict]:
+        """Requests created in [start, end), newest first; naive bounds are server-local time"""
+        start_ms = _to_ms(start) if start else None
+        end_ms = _to_ms(end) if end else None
+        ids = self._sorted_ids
+        low = bisect.bisect_left(ids, compose_id(start_ms)) if start else 0
+        high = bisect.bisect_left(ids, compose_id(end_ms)) if end else len(ids)
+        results = [self._by_number[number] for number in reversed(ids[low:high])]
+
+        first = bisect.bisect_left(self._legacy_ms, start_ms) if start else 0
+        last = bisect.bisect_left(self._legacy_ms, end_ms) if end else len(self._legacy_ms)
+        if first == last:
+            return results
+        # Each matching legacy request goes after the newer (or same-millisecond) ids
+        merged: List[Dict] = []
+        taken = 0
+        for i in range(last - 1, first - 1, -1):
+            newer = high - bisect.bisect_left(ids, compose_id(self._legacy_ms[i]), low, high)
+            merged.extend(results[taken:newer])
+            merged.append(self._legacy[i])
+            taken = newer
+        merged.extend(results[taken:])
+        return merged
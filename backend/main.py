@@ -3,7 +3,8 @@ BridgeAI FastAPI Backend
 Complete API for AI-Powered Rapid Support Network
 """
 
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Header
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
@@ -13,6 +14,23 @@ from dotenv import load_dotenv
 import google.generativeai as genai
 import httpx
 import math
+import asyncio
+import time
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+from admission import (
+    AdmissionMiddleware, LoadShedError, admission_controller, llm_limiter,
+    LLM_MAX_WAIT, LLM_ENRICHMENT_MAX_WAIT, PRIORITY_LOW, PRIORITY_HIGH
+)
+from triage import TriageQueue
+from profiler import ProfilingMiddleware, profiler, check_admin_token, PROFILER_ADMIN_TOKEN
+from batching import MicroBatcher
+from analytics import DemandAggregator, ALL, cell_for, cell_bounds
+from hours import build_hours_index, localize
+from routing import load_walking_graph, ROUTING_CANDIDATES
+from ids import SnowflakeGenerator, TimeOrderedIndex, format_id
+from tone_classifier import ToneClassifier, TONE_CONFIDENCE_THRESHOLD, TONE_MODEL_PATH, distress_cues
 
 load_dotenv()
 
@@ -23,6 +41,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Sampling profiler (innermost, so it profiles handler work rather than queueing)
+app.add_middleware(ProfilingMiddleware, routes=app.router.routes)
+
+# Admission control (added before CORS so CORS headers wrap its 429/503 responses)
+app.add_middleware(AdmissionMiddleware)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -42,9 +66,20 @@ else:
     gemini_model = None
     print("⚠️ Gemini AI not configured")
 
+# Local tone classifier (answers confident cases without calling Gemini)
+try:
+    tone_classifier = ToneClassifier.load(TONE_MODEL_PATH)
+    print("✅ Local tone classifier loaded")
+except (OSError, ValueError, KeyError) as e:
+    tone_classifier = None
+    print(f"⚠️ Local tone classifier not loaded: {e}")
+
+# Optional street graph for walking-time ranking (memory-mapped, shared across workers)
+walking_graph = load_walking_graph()
+
 # VAPI Configuration
 VAPI_API_KEY = os.getenv("VAPI_API_KEY")
-VAPI_BASE_URL = "https://api.vapi.ai"
+VAPI_BASE_URL = os.getenv("VAPI_BASE_URL", "https://api.vapi.ai")
 print(f"✅ VAPI configured: {bool(VAPI_API_KEY)}")
 
 # ==================== DATA MODELS ====================
@@ -119,6 +154,9 @@ class ResourceSearchRequest(BaseModel):
     location: Location
     type: Optional[str] = None
     limit: int = 5
+    openNow: bool = False  # Only resources open right now
+    openAt: Optional[datetime] = None  # Only resources open at this time
+    walking: bool = True  # Rank by walking time when a street graph is loaded
 
 class CallRequest(BaseModel):
     phoneNumber: str
@@ -157,6 +195,10 @@ safety_scores_db: List[Dict] = []  # List of SafetyScore entries
 volunteer_matches_db: List[Dict] = []  # List of VolunteerMatch entries
 heatmap_data_db: List[Dict] = []  # List of NeedHeatmapEntry entries
 follow_up_queue: List[Dict] = []  # List of scheduled follow-ups
+triage_queue = TriageQueue()  # Open/urgent requests by dispatch priority
+request_index = TimeOrderedIndex()  # Requests by id, ids in creation order
+request_ids = SnowflakeGenerator()
+demand_trends = DemandAggregator()  # Sliding/tumbling demand counts per cell and category
 
 resources_db: List[Dict] = [
     {
@@ -252,6 +294,13 @@ resources_db: List[Dict] = [
     }
 ]
 
+# Opening hours parsed once into weekly bitmaps (resource id -> schedule)
+hours_index = build_hours_index(resources_db)
+
+for _request in requests_db:
+    request_index.add(_request)
+    triage_queue.sync(_request)
+
 # ==================== HELPER FUNCTIONS ====================
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -268,25 +317,184 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     
     return R * c
 
-async def analyze_tone_with_ai(text: str) -> str:
-    """Analyze emotional tone using Gemini AI"""
-    if not gemini_model:
+# Blocking Gemini calls get their own pool, sized to the LLM gate; the default
+# executor's min(32, cpus + 4) threads would silently cap concurrency below it
+llm_executor = ThreadPoolExecutor(max_workers=llm_limiter.max_concurrency, thread_name_prefix="gemini")
+
+def set_llm_concurrency(limit: int):
+    """Resize the LLM gate and its thread pool together"""
+    global llm_executor
+    llm_limiter.max_concurrency = max(1, limit)
+    old_executor = llm_executor
+    llm_executor = ThreadPoolExecutor(max_workers=llm_limiter.max_concurrency, thread_name_prefix="gemini")
+    old_executor.shutdown(wait=False)
+
+async def generate_content(prompt: str, priority: int = PRIORITY_LOW, max_wait: Optional[float] = None):
+    """Run a Gemini call off the event loop, shedding load when the LLM gate is full"""
+    # Low priority callers never queue; they fall back to their mock answer immediately
+    timeout = max_wait if max_wait is not None else (LLM_MAX_WAIT if priority > PRIORITY_LOW else 0)
+    if not await llm_limiter.acquire(priority, timeout=timeout):
+        raise LoadShedError("Gemini capacity exhausted")
+    
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(llm_executor, gemini_model.generate_content, prompt)
+    finally:
+        llm_limiter.release(time.perf_counter() - start)
+
+def parse_tone(tone_text: str) -> str:
+    """Map free-form model output to one of the supported tones"""
+    if "Distressed" in tone_text:
+        return "Distressed"
+    elif "Anxious" in tone_text:
+        return "Anxious"
+    else:
         return "Calm"
-    
+
+def parse_numbered_tones(text: str, count: int) -> Optional[List[str]]:
+    """Parse "<n>: <tone>" lines; None unless every item 1..count is answered"""
+    tones = {}
+    for match in re.finditer(r'^\W*(\d+)\W+(Calm|Anxious|Distressed)\b', text, re.IGNORECASE | re.MULTILINE):
+        tones[int(match.group(1))] = match.group(2).capitalize()
+    if set(tones) != set(range(1, count + 1)):
+        return None
+    return [tones[i] for i in range(1, count + 1)]
+
+def parse_numbered_sections(text: str, count: int) -> Optional[List[List[str]]]:
+    """Parse "### <n>" sections of bullet points; None unless every item 1..count is present"""
+    sections: Dict[int, List[str]] = {}
+    current = None
+    for line in text.split("\n"):
+        header = re.match(r'^\s*#+\s*(\d+)', line)
+        if header:
+            current = int(header.group(1))
+            sections[current] = []
+        elif current is not None and line.strip():
+            sections[current].append(line.strip("- ").strip())
+    if set(sections) != set(range(1, count + 1)):
+        return None
+    return [sections[i] for i in range(1, count + 1)]
+
+async def _analyze_tone_single(text: str, priority: int, fallback: str = "Calm",
+                               max_wait: Optional[float] = None) -> str:
     try:
         prompt = f'Analyze the emotional tone and classify as "Calm", "Anxious", or "Distressed". Respond with only one word: {text}'
-        response = gemini_model.generate_content(prompt)
-        tone_text = response.text.strip()
-        
-        if "Distressed" in tone_text:
-            return "Distressed"
-        elif "Anxious" in tone_text:
-            return "Anxious"
-        else:
-            return "Calm"
+        response = await generate_content(prompt, priority, max_wait)
+        return parse_tone(response.text.strip())
     except Exception as e:
         print(f"Gemini tone analysis error: {e}")
-        return "Calm"
+        return fallback
+
+async def classify_tone_batch(items: List[tuple]) -> List[str]:
+    """
+    Classify (text, priority, fallback, max_wait) items with one multi-item prompt,
+    falling back to single calls. The batch waits for the LLM gate no longer than
+    its most impatient item allows.
+    """
+    texts = [text for text, _, _, _ in items]
+    fallbacks = [fallback for _, _, fallback, _ in items]
+    priority = max(p for _, p, _, _ in items)
+    budgets = [w for _, _, _, w in items if w is not None]
+    max_wait = min(budgets) if budgets else None
+    if len(texts) == 1:
+        return [await _analyze_tone_single(texts[0], priority, fallbacks[0], max_wait)]
+    
+    numbered = "\n".join(f"{i}. {' '.join(text.split())}" for i, text in enumerate(texts, 1))
+    prompt = f'''Classify the emotional tone of each numbered message as "Calm", "Anxious", or "Distressed".
+Respond with exactly one line per message in the form "<number>: <tone>".
+{numbered}'''
+    try:
+        response = await generate_content(prompt, priority, max_wait)
+        tones = parse_numbered_tones(response.text, len(texts))
+    except LoadShedError as e:
+        print(f"Gemini tone analysis error: {e}")
+        return fallbacks
+    except Exception as e:
+        print(f"Gemini batch tone analysis error: {e}")
+        tones = None
+    
+    if tones is None:
+        print(f"⚠️ Batch tone parse failed, falling back to {len(texts)} single calls")
+        return list(await asyncio.gather(*(
+            _analyze_tone_single(text, priority, fallback, max_wait) for text, fallback in zip(texts, fallbacks)
+        )))
+    return tones
+
+tone_batcher = MicroBatcher(classify_tone_batch)
+
+async def analyze_tone_with_ai(text: str, priority: int = PRIORITY_LOW, fallback: str = "Calm",
+                               max_wait: Optional[float] = None) -> str:
+    """
+    Analyze emotional tone using Gemini AI (micro-batched with concurrent callers).
+    `max_wait` caps the wait for the LLM gate; by default it follows the priority.
+    """
+    if not gemini_model:
+        return fallback
+    
+    return await tone_batcher.submit((text, priority, fallback, max_wait))
+
+async def detect_tone(text: str, priority: int = PRIORITY_LOW, max_wait: Optional[float] = None) -> Dict[str, Any]:
+    """Classify tone locally, escalating to Gemini only when the local model is unsure"""
+    if not tone_classifier:
+        fallback = "Distressed" if distress_cues(text) else "Calm"
+        tone = await analyze_tone_with_ai(text, priority, fallback, max_wait)
+        return {"tone": tone, "confidence": None, "escalated": bool(gemini_model)}
+    
+    tone, confidence = tone_classifier.classify(text)
+    # The local model is small and overconfident on mixed texts ("could you recommend
+    # a clinic, I overdosed"), so it never gets to rule out a distress cue on its own
+    if tone != "Distressed" and distress_cues(text):
+        if not gemini_model:
+            return {"tone": "Distressed", "confidence": None, "escalated": False}
+        return {"tone": await analyze_tone_with_ai(text, priority, "Distressed", max_wait),
+                "confidence": None, "escalated": True}
+    
+    if confidence >= TONE_CONFIDENCE_THRESHOLD or not gemini_model:
+        return {"tone": tone, "confidence": round(confidence, 3), "escalated": False}
+    
+    # Gemini errors and load shedding fall back to the local answer; the local
+    # confidence doesn't describe Gemini's tone, so it isn't reported
+    ai_tone = await analyze_tone_with_ai(text, priority, tone, max_wait)
+    return {"tone": ai_tone, "confidence": None, "escalated": True}
+
+async def _extract_memory_single(conversation: List[str]) -> List[str]:
+    try:
+        prompt = f"Extract 2-3 key points from this conversation: {conversation}. Return as a brief list."
+        response = await generate_content(prompt)
+        memory_points = response.text.strip().split("\n")
+        return [point.strip("- ").strip() for point in memory_points if point.strip()]
+    except Exception as e:
+        print(f"Memory generation error: {e}")
+        return ["Needs assistance"]
+
+async def extract_memory_batch(conversations: List[List[str]]) -> List[List[str]]:
+    """Extract key points for several conversations with one prompt, falling back to single calls"""
+    if len(conversations) == 1:
+        return [await _extract_memory_single(conversations[0])]
+    
+    # One JSON line per conversation, so no caller's text can start a "### <n>" header of its own
+    numbered = "\n".join(
+        f"### {i}\n{json.dumps(conversation, ensure_ascii=False)}" for i, conversation in enumerate(conversations, 1)
+    )
+    prompt = f'''Extract 2-3 key points from each numbered conversation below (each is given as JSON).
+For each one, write a "### <number>" line followed by its points as a brief "- " list.
+{numbered}'''
+    try:
+        response = await generate_content(prompt)
+        sections = parse_numbered_sections(response.text, len(conversations))
+    except LoadShedError as e:
+        print(f"Memory generation error: {e}")
+        return [["Needs assistance"] for _ in conversations]
+    except Exception as e:
+        print(f"Batch memory generation error: {e}")
+        sections = None
+    
+    if sections is None:
+        print(f"⚠️ Batch memory parse failed, falling back to {len(conversations)} single calls")
+        return list(await asyncio.gather(*(_extract_memory_single(c) for c in conversations)))
+    return sections
+
+memory_batcher = MicroBatcher(extract_memory_batch)
 
 async def generate_ai_response(message: str, tone: str, context: Dict = None) -> str:
     """Generate empathetic AI response using Gemini"""
@@ -300,7 +508,7 @@ The user's emotional tone is {tone}. {context_str}
 Respond empathetically and helpfully to: "{message}"
 Keep response under 100 words and be supportive.'''
         
-        response = gemini_model.generate_content(prompt)
+        response = await generate_content(prompt)
         return response.text.strip()
     except Exception as e:
         print(f"Gemini response generation error: {e}")
@@ -376,6 +584,7 @@ def log_heatmap_data(location: Location, category: str, weather: Optional[str] =
         "weather": weather,
         "count": 1
     })
+    demand_trends.record(location.lat, location.lng, category)
     print(f"📊 Heatmap data logged: {category} at {location.address}")
 
 async def schedule_follow_up_call(request_id: str, hours_delay: int = 24):
@@ -413,11 +622,12 @@ async def analyze_tone(request: AIRequest):
     if not text:
         raise HTTPException(status_code=400, detail="Text is required")
     
-    tone = await analyze_tone_with_ai(text)
+    result = await detect_tone(text)
     
+    # confidence is the local classifier's probability for its own answer; None when
+    # the tone came from Gemini or was forced to Distressed by a cue word
     return {
-        "tone": tone,
-        "confidence": 0.9,
+        **result,
         "mock": not bool(gemini_model)
     }
 
@@ -445,7 +655,7 @@ async def legal_help(request: AIRequest):
     
     try:
         prompt = f"As a legal assistant helping homeless individuals, provide brief guidance on: {question}. Keep response under 150 words."
-        response = gemini_model.generate_content(prompt)
+        response = await generate_content(prompt)
         return {"response": response.text.strip()}
     except Exception as e:
         print(f"Legal help error: {e}")
@@ -479,14 +689,7 @@ async def generate_memory(request: Dict):
     if not gemini_model:
         return {"memory": ["First interaction", "Needs assistance"]}
     
-    try:
-        prompt = f"Extract 2-3 key points from this conversation: {conversation}. Return as a brief list."
-        response = gemini_model.generate_content(prompt)
-        memory_points = response.text.strip().split("\n")
-        return {"memory": [point.strip("- ").strip() for point in memory_points if point.strip()]}
-    except Exception as e:
-        print(f"Memory generation error: {e}")
-        return {"memory": ["Needs assistance"]}
+    return {"memory": await memory_batcher.submit(conversation)}
 
 # ==================== RESOURCE ENDPOINTS ====================
 
@@ -495,6 +698,27 @@ async def get_resources():
     """Get all resources"""
     return {"resources": resources_db}
 
+def rank_by_walking_time(location: Location, resources: List[Dict], limit: int) -> List[Dict]:
+    """
+    Re-rank straight-line candidates by walking time over the street graph.
+    Candidates that can't be reached (or weren't needed) follow by distance.
+    """
+    quickest = walking_graph.closest(
+        (location.lat, location.lng),
+        [(r["location"]["lat"], r["location"]["lng"]) for r in resources],
+        limit
+    )
+    ranked = []
+    for index, seconds in quickest:
+        resources[index]["walkingMinutes"] = round(seconds / 60, 1)
+        ranked.append(resources[index])
+    chosen = {index for index, _ in quickest}
+    for index, resource in enumerate(resources):
+        if index not in chosen:
+            resource["walkingMinutes"] = None
+            ranked.append(resource)
+    return ranked
+
 @app.post("/api/resources/search")
 async def search_resources(request: ResourceSearchRequest):
     """Search resources by location and type"""
@@ -505,9 +729,18 @@ async def search_resources(request: ResourceSearchRequest):
     # Filter by type if specified
     filtered = resources_db if not resource_type else [r for r in resources_db if r["type"] == resource_type]
     
+    # Opening hours are checked before distance: one bit test per candidate
+    moment = localize(request.openAt)
+    require_open = request.openNow or request.openAt is not None
+    
     # Calculate distances
     with_distances = []
     for resource in filtered:
+        schedule = hours_index.get(resource["id"])
+        is_open = schedule.is_open(moment) if schedule else None
+        if require_open and not is_open:
+            continue
+        
         distance = calculate_distance(
             location.lat,
             location.lng,
@@ -516,31 +749,45 @@ async def search_resources(request: ResourceSearchRequest):
         )
         resource_copy = resource.copy()
         resource_copy["distance"] = round(distance, 2)
+        resource_copy["isOpen"] = is_open
         with_distances.append(resource_copy)
     
-    # Sort by distance and limit
-    sorted_resources = sorted(with_distances, key=lambda x: x["distance"])[:limit]
+    # Sort by distance (re-ranking the nearest by walking time if routing is set up) and limit
+    sorted_resources = sorted(with_distances, key=lambda x: x["distance"])
+    if walking_graph and request.walking and limit > 0:
+        sorted_resources = rank_by_walking_time(location, sorted_resources[:max(limit, ROUTING_CANDIDATES)], limit)
+    sorted_resources = sorted_resources[:limit]
+    
+    # Next opening/closing time, only for the resources actually returned
+    for resource in sorted_resources:
+        schedule = hours_index.get(resource["id"])
+        next_open = schedule.next_open(moment) if schedule else None
+        closes_at = schedule.next_close(moment) if schedule else None
+        resource["nextOpen"] = next_open.isoformat() if next_open else None
+        resource["closesAt"] = closes_at.isoformat() if closes_at else None
     
     return {"resources": sorted_resources}
 
 # ==================== REQUEST ENDPOINTS ====================
 
 @app.get("/api/requests")
-async def get_requests():
-    """Get all requests"""
+async def get_requests(since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """Get all requests, or those created in [since, until) when either is given"""
+    if since or until:
+        return {"requests": request_index.range(since, until)}
     return {"requests": requests_db}
 
 @app.post("/api/requests")
 async def create_request(request: Request):
     """Create new help request with advanced features"""
     
-    # Auto-detect tone if not provided
-    if request.description and gemini_model:
-        tone = await analyze_tone_with_ai(request.description)
-        request.tone = tone
+    # Auto-detect tone from the description
+    if request.description:
+        # Tone is an enrichment: when Gemini is saturated, take the fallback rather than queue
+        request.tone = (await detect_tone(request.description, PRIORITY_HIGH, LLM_ENRICHMENT_MAX_WAIT))["tone"]
     
     # Generate ID and timestamp
-    request.id = f"req-{int(datetime.now().timestamp() * 1000)}"
+    request.id = format_id("req", request_ids.next_id())
     request.timestamp = datetime.now()
     
     # Convert to dict and add to database
@@ -561,6 +808,8 @@ async def create_request(request: Request):
         print(f"🚨 HIGH RISK REQUEST: {request.id} scored {safety_score}/5")
     
     requests_db.insert(0, request_dict)
+    request_index.add(request_dict)
+    triage_queue.sync(request_dict)
     
     # Update user memory if not anonymous
     if request.name and request.name != "Anonymous":
@@ -575,23 +824,25 @@ async def create_request(request: Request):
 @app.post("/api/requests/{request_id}/assign")
 async def assign_request(request_id: str):
     """Assign request to volunteer"""
-    request = next((r for r in requests_db if r["id"] == request_id), None)
+    request = request_index.get(request_id)
     
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
     
     request["status"] = "assigned"
+    triage_queue.sync(request)
     return request
 
 @app.post("/api/requests/{request_id}/resolve")
 async def resolve_request(request_id: str):
     """Mark request as resolved"""
-    request = next((r for r in requests_db if r["id"] == request_id), None)
+    request = request_index.get(request_id)
     
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
     
     request["status"] = "resolved"
+    triage_queue.sync(request)
     
     # Schedule follow-up call 24-48 hours later
     await schedule_follow_up_call(request_id, hours_delay=24)
@@ -599,6 +850,26 @@ async def resolve_request(request_id: str):
     
     return request
 
+# ==================== TRIAGE ENDPOINTS ====================
+
+@app.get("/api/triage/next")
+async def get_triage_next(k: int = 1):
+    """Get the k highest-priority requests awaiting dispatch"""
+    if k < 1:
+        raise HTTPException(status_code=400, detail="k must be at least 1")
+    return {"requests": triage_queue.top(k), "queued": len(triage_queue)}
+
+@app.post("/api/triage/next")
+async def claim_triage_next():
+    """Atomically claim the highest-priority request (marks it assigned)"""
+    request = triage_queue.claim()
+    
+    if not request:
+        raise HTTPException(status_code=404, detail="No requests awaiting dispatch")
+    
+    request["status"] = "assigned"
+    return request
+
 # ==================== ADVANCED FEATURE ENDPOINTS ====================
 
 @app.post("/api/memory/{user_id}")
@@ -617,7 +888,7 @@ async def get_memory(user_id: str):
 @app.post("/api/safety-score/{request_id}")
 async def calculate_and_store_safety_score(request_id: str, weather: Optional[str] = None):
     """Calculate and store safety score for a request"""
-    request = next((r for r in requests_db if r["id"] == request_id), None)
+    request = request_index.get(request_id)
     
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
@@ -645,6 +916,8 @@ async def calculate_and_store_safety_score(request_id: str, weather: Optional[st
         print(f"🚨 HIGH RISK: Request {request_id} scored {score}/5 - ESCALATING")
         request["status"] = "urgent"
     
+    triage_queue.sync(request)
+    
     return safety_entry
 
 @app.get("/api/safety-scores")
@@ -655,7 +928,7 @@ async def get_safety_scores():
 @app.post("/api/volunteer/match")
 async def create_volunteer_match(request_id: str, volunteer_id: str):
     """Create a volunteer match for an urgent request"""
-    request = next((r for r in requests_db if r["id"] == request_id), None)
+    request = request_index.get(request_id)
     
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
@@ -703,6 +976,25 @@ async def get_heatmap():
     """Get heatmap data"""
     return {"heatmapData": heatmap_data_db}
 
+@app.get("/api/trends")
+async def get_trends(category: str = ALL, lat: Optional[float] = None, lng: Optional[float] = None,
+                     cell: Optional[str] = None):
+    """Get windowed demand counts (5m, 1h, 1d, 7d) for a grid cell and/or category"""
+    if cell is None and lat is not None and lng is not None:
+        cell = cell_for(lat, lng)
+    
+    try:
+        bounds = cell_bounds(cell) if cell else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="cell must look like '<row>:<col>'")
+    
+    return {
+        "cell": cell or ALL,
+        "bounds": bounds,
+        "category": category,
+        "windows": demand_trends.query(cell or ALL, category)
+    }
+
 @app.get("/api/follow-ups")
 async def get_follow_up_queue():
     """Get scheduled follow-up calls"""
@@ -721,7 +1013,7 @@ async def complete_follow_up(request_id: str, outcome: str, user_safe: bool):
     follow_up["completedAt"] = datetime.now().isoformat()
     
     # Update request
-    request = next((r for r in requests_db if r["id"] == request_id), None)
+    request = request_index.get(request_id)
     if request:
         request["lastFollowUp"] = datetime.now().isoformat()
         
@@ -730,6 +1022,7 @@ async def complete_follow_up(request_id: str, outcome: str, user_safe: bool):
             print(f"🚨 FOLLOW-UP ESCALATION: User from request {request_id} is not safe!")
             request["status"] = "urgent"
             request["safetyScore"] = 5
+            triage_queue.sync(request)
     
     return {"success": True, "followUp": follow_up}
 
@@ -869,6 +1162,50 @@ async def get_stats():
         "resources": len(resources_db)
     }
 
+@app.get("/api/admission")
+async def get_admission_stats():
+    """Get admission control state (concurrency, queueing and shed counts)"""
+    return {
+        "routes": admission_controller.snapshot(),
+        "llm": {
+            "active": llm_limiter.active,
+            "waiting": llm_limiter.waiting,
+            "maxConcurrency": llm_limiter.max_concurrency,
+            "serviceTimeMs": round(llm_limiter.service_time * 1000, 2)
+        },
+        "batching": {
+            "tone": tone_batcher.stats(),
+            "memory": memory_batcher.stats()
+        }
+    }
+
+# ==================== ADMIN ENDPOINTS ====================
+
+def require_admin(token: Optional[str]):
+    """Admin endpoints fail closed: they need PROFILER_ADMIN_TOKEN configured and presented"""
+    if not PROFILER_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (PROFILER_ADMIN_TOKEN not set)")
+    if not check_admin_token(token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/api/admin/profile")
+async def get_profile(route: Optional[str] = None, format: str = "json",
+                      x_admin_token: Optional[str] = Header(None)):
+    """Get sampled profiles per route (format=folded for flamegraph.pl / speedscope)"""
+    require_admin(x_admin_token)
+    
+    if format == "folded":
+        return PlainTextResponse(profiler.folded(route))
+    
+    return {"routes": profiler.summary(), "intervalMs": profiler.interval * 1000}
+
+@app.delete("/api/admin/profile")
+async def reset_profile(x_admin_token: Optional[str] = Header(None)):
+    """Discard collected profiles"""
+    require_admin(x_admin_token)
+    profiler.reset()
+    return {"success": True}
+
 # Application startup
 print(f"\n🚀 GuideMe FastAPI Backend")
 print(f"📊 Initial data: {len(requests_db)} requests, {len(resources_db)} resources")
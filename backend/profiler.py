@@ -0,0 +1,191 @@
+"""
+On-demand sampling profiler
+Opt-in middleware that profiles a fraction of requests (or any request
+carrying X-Profile) by periodically sampling the event loop thread's
+stack, aggregating collapsed stacks per route for flamegraph tools.
+"""
+
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from starlette.routing import Match
+
+PROFILE_HEADER = b"x-profile"
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILER_ADMIN_TOKEN = os.getenv("PROFILER_ADMIN_TOKEN")
+
+MAX_STACKS_PER_ROUTE = 5000
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    # Function-level labels (not the current line) so samples aggregate per function
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of threads running profiled requests.
+    Requests register the frame of the middleware call that drives them;
+    a sampled stack is attributed to a route when one of those frames is
+    on it. The sampler thread sleeps while no request is registered.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks: Dict[str, Counter] = {}
+        self.requests: Counter = Counter()
+        self.samples: Counter = Counter()
+        self._active: Dict[int, tuple] = {}  # id(frame) -> (thread id, route)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, frame, route: str):
+        with self._lock:
+            self._active[id(frame)] = (threading.get_ident(), route)
+            self.requests[route] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+            self._wake.set()
+
+    def unregister(self, frame):
+        with self._lock:
+            self._active.pop(id(frame), None)
+            if not self._active:
+                self._wake.clear()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            self.sample()
+
+    def sample(self):
+        """Take one sample of every thread with a registered request"""
+        with self._lock:
+            if not self._active:
+                return
+            thread_ids = {thread_id for thread_id, _ in self._active.values()}
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self._record(frame)
+
+    def _record(self, frame):
+        labels: List[str] = []
+        route = None
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            entry = self._active.get(id(frame))
+            if entry is not None:
+                route = entry[1]
+                break
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        # Only the request currently on the loop is attributed; idle loop time is skipped
+        if route is None or not labels:
+            return
+
+        self.samples[route] += 1
+        stacks = self.stacks.setdefault(route, Counter())
+        folded = ";".join(reversed(labels))
+        if folded in stacks or len(stacks) < MAX_STACKS_PER_ROUTE:
+            stacks[folded] += 1
+        else:
+            stacks["[truncated]"] += 1
+
+    def folded(self, route: Optional[str] = None) -> str:
+        """Collapsed stacks ("frame;frame;frame count"), as read by flamegraph.pl and speedscope"""
+        with self._lock:
+            routes = [route] if route else sorted(self.stacks)
+            lines = []
+            for name in routes:
+                for stack, count in self.stacks.get(name, {}).items():
+                    # Prefix with the route so one file can hold every route
+                    lines.append(f"{name};{stack} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def summary(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                route: {
+                    "profiledRequests": self.requests[route],
+                    "samples": self.samples[route],
+                    "sampledMs": round(self.samples[route] * self.interval * 1000, 1),
+                    "distinctStacks": len(self.stacks.get(route, {})),
+                }
+                for route in self.requests
+            }
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.requests.clear()
+            self.samples.clear()
+
+
+profiler = SamplingProfiler()
+
+
+def _route_template(routes, scope) -> str:
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return f"{scope['method']} {route.path}"
+    return f"{scope['method']} {scope['path']}"
+
+
+def check_admin_token(token: Optional[str]) -> bool:
+    """Constant-time token check; always fails when no token is configured"""
+    if not PROFILER_ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("latin-1"), PROFILER_ADMIN_TOKEN.encode("latin-1"))
+
+
+def _wants_profile(scope) -> bool:
+    for key, value in scope.get("headers", []):
+        if key == PROFILE_HEADER:
+            return check_admin_token(value.decode("latin-1"))
+    return False
+
+
+class ProfilingMiddleware:
+    """
+    Profiles PROFILE_SAMPLE_RATE of HTTP requests, plus any with an X-Profile
+    header whose value matches PROFILER_ADMIN_TOKEN (ignored when none is set).
+    When PROFILING_ENABLED is false this is a single attribute check.
+    """
+
+    def __init__(self, app, routes=(), sampler: SamplingProfiler = profiler):
+        self.app = app
+        self.routes = routes
+        self.sampler = sampler
+
+    async def __call__(self, scope, receive, send):
+        if not PROFILING_ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if not (_wants_profile(scope) or (PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE)):
+            await self.app(scope, receive, send)
+            return
+
+        frame = sys._getframe()
+        self.sampler.register(frame, _route_template(self.routes, scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.sampler.unregister(frame)
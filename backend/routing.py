@@ -0,0 +1,388 @@
+"""
+Walking-time routing over a local street graph
+An OSM extract is preprocessed offline into a compact array-backed graph
+(CSR adjacency, nodes bucketed by grid cell, landmark distance tables for
+ALT A* search) stored in one binary file. Workers memory-map that file,
+so loading is instant and the pages are shared between processes.
+
+Build a graph:
+    python routing.py build sf.osm -o sf.graph --landmarks 8
+"""
+
+import argparse
+import bisect
+import heapq
+import math
+import mmap
+import os
+import struct
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+ROUTING_GRAPH_PATH = os.getenv("ROUTING_GRAPH_PATH")
+ROUTING_CANDIDATES = int(os.getenv("ROUTING_CANDIDATES", "20"))  # Haversine top-N to re-rank
+ROUTING_MAX_MINUTES = float(os.getenv("ROUTING_MAX_MINUTES", "120"))  # Give up on longer walks
+WALKING_SPEED_MPS = 1.4
+
+MAGIC = b"BRGRAPH1"
+HEADER = struct.Struct("<8sIIIId")  # magic, nodes, edges, landmarks, cells, cell size (degrees)
+CELL_SIZE_DEG = 0.001  # ~110m; a handful of nodes per cell in a dense city
+MAX_SNAP_RINGS = 8  # Give up snapping points more than ~700m from any street
+EARTH_RADIUS_M = 6371000
+
+# Ways people can walk along; motorways and trunk roads are excluded
+WALKABLE_HIGHWAYS = {
+    "primary", "primary_link", "secondary", "secondary_link", "tertiary", "tertiary_link",
+    "unclassified", "residential", "living_street", "service", "pedestrian", "footway",
+    "path", "steps", "track", "cycleway", "crossing", "corridor",
+}
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _tobler_speed(slope: float) -> float:
+    """Tobler's hiking function, in m/s"""
+    return 6 * math.exp(-3.5 * abs(slope + 0.05)) / 3.6
+
+
+def walking_seconds(length_m: float, rise_m: Optional[float] = None, speed: float = WALKING_SPEED_MPS) -> float:
+    """
+    Time to walk an edge. With elevations, the flat speed is scaled by
+    Tobler's function averaged over both directions, keeping the graph
+    symmetric (which the landmark heuristic relies on). Slopes never make
+    walking faster than flat ground, so straight-line time stays a lower bound.
+    """
+    if rise_m is None or length_m <= 0:
+        return length_m / speed
+    slope = rise_m / length_m
+    factor = (_tobler_speed(slope) + _tobler_speed(-slope)) / 2 / _tobler_speed(0)
+    return length_m / (speed * min(factor, 1.0))
+
+
+def _cell_key(lat: float, lng: float, cell_size: float) -> int:
+    return (math.floor(lat / cell_size) << 32) + (math.floor(lng / cell_size) + (1 << 31))
+
+
+# ==================== OFFLINE PREPROCESSING ====================
+
+def parse_osm(path: str) -> Tuple[Dict[int, Tuple[float, float, Optional[float]]], List[List[int]]]:
+    """Nodes (id -> lat, lng, elevation) and walkable ways (node id lists) from an .osm XML file"""
+    nodes: Dict[int, Tuple[float, float, Optional[float]]] = {}
+    ways: List[List[int]] = []
+    for _, element in ET.iterparse(path, events=("end",)):
+        if element.tag == "node":
+            ele = next((t.get("v") for t in element.iter("tag") if t.get("k") == "ele"), None)
+            try:
+                elevation = float(ele) if ele is not None else None
+            except ValueError:
+                elevation = None
+            nodes[int(element.get("id"))] = (float(element.get("lat")), float(element.get("lon")), elevation)
+            element.clear()
+        elif element.tag == "way":
+            tags = {t.get("k"): t.get("v") for t in element.iter("tag")}
+            if (tags.get("highway") in WALKABLE_HIGHWAYS
+                    and tags.get("foot") not in ("no", "private")
+                    and tags.get("access") not in ("no", "private")):
+                ways.append([int(nd.get("ref")) for nd in element.iter("nd")])
+            element.clear()
+    return nodes, ways
+
+
+def _largest_component(adjacency: Dict[int, Dict[int, float]]) -> set:
+    seen, best = set(), set()
+    for start in adjacency:
+        if start in seen:
+            continue
+        component, stack = {start}, [start]
+        while stack:
+            for neighbour in adjacency[stack.pop()]:
+                if neighbour not in component:
+                    component.add(neighbour)
+                    stack.append(neighbour)
+        seen |= component
+        if len(component) > len(best):
+            best = component
+    return best
+
+
+def _dijkstra_all(offsets: Sequence[int], targets: Sequence[int], weights: Sequence[float], source: int) -> List[float]:
+    dist = [math.inf] * (len(offsets) - 1)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            nd = d + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def build_graph(nodes: Dict[int, Tuple[float, float, Optional[float]]], ways: List[List[int]],
+                output: str, landmarks: int = 8, cell_size: float = CELL_SIZE_DEG,
+                speed: float = WALKING_SPEED_MPS) -> Dict[str, int]:
+    """Preprocess parsed OSM data and write the binary graph file"""
+    adjacency: Dict[int, Dict[int, float]] = {}
+    for way in ways:
+        for a, b in zip(way, way[1:]):
+            if a == b or a not in nodes or b not in nodes:
+                continue
+            lat1, lng1, ele1 = nodes[a]
+            lat2, lng2, ele2 = nodes[b]
+            rise = ele2 - ele1 if ele1 is not None and ele2 is not None else None
+            cost = walking_seconds(haversine_m(lat1, lng1, lat2, lng2), rise, speed)
+            for u, v in ((a, b), (b, a)):
+                edges = adjacency.setdefault(u, {})
+                edges[v] = min(cost, edges.get(v, math.inf))
+
+    # Islands would make snapped queries unreachable; keep the main component
+    keep = _largest_component(adjacency)
+    order = sorted(keep, key=lambda osm_id: (_cell_key(nodes[osm_id][0], nodes[osm_id][1], cell_size), osm_id))
+    index = {osm_id: i for i, osm_id in enumerate(order)}
+
+    lat, lng = array("d"), array("d")
+    offsets, targets, weights = array("I", [0]), array("I"), array("f")
+    cell_keys, cell_starts = array("q"), array("I")
+    for i, osm_id in enumerate(order):
+        node_lat, node_lng, _ = nodes[osm_id]
+        lat.append(node_lat)
+        lng.append(node_lng)
+        key = _cell_key(node_lat, node_lng, cell_size)
+        if not cell_keys or cell_keys[-1] != key:
+            cell_keys.append(key)
+            cell_starts.append(i)
+        for neighbour, cost in sorted(adjacency[osm_id].items(), key=lambda item: index[item[0]]):
+            targets.append(index[neighbour])
+            weights.append(cost)
+        offsets.append(len(targets))
+    cell_starts.append(len(order))
+
+    # Landmarks by farthest-point selection; their distance tables drive ALT
+    landmark_dist = array("f")
+    chosen: List[int] = []
+    nearest = _dijkstra_all(offsets, targets, weights, 0) if order else []
+    for _ in range(min(landmarks, len(order))):
+        candidate = max(range(len(order)), key=nearest.__getitem__)
+        if candidate in chosen:
+            break
+        chosen.append(candidate)
+        dist = _dijkstra_all(offsets, targets, weights, candidate)
+        landmark_dist.extend(dist)
+        nearest = dist if len(chosen) == 1 else [min(a, b) for a, b in zip(nearest, dist)]
+
+    with open(output, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(order), len(targets), len(chosen), len(cell_keys), cell_size))
+        for arr in (lat, lng, offsets, targets, weights, cell_keys, cell_starts, landmark_dist):
+            _write_aligned(f, arr)
+    return {"nodes": len(order), "edges": len(targets), "landmarks": len(chosen), "cells": len(cell_keys)}
+
+
+def _write_aligned(f, arr: array):
+    padding = -f.tell() % 8
+    f.write(b"\0" * padding)
+    arr.tofile(f)
+
+
+# ==================== RUNTIME ====================
+
+class WalkingGraph:
+    """Read-only view over a memory-mapped graph file; arrays are zero-copy memoryviews"""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, m, k, cells, self.cell_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a routing graph")
+        self.node_count, self.edge_count, self.landmark_count = n, m, k
+
+        view = memoryview(self._mmap)
+        position = HEADER.size
+
+        def take(fmt: str, count: int) -> memoryview:
+            nonlocal position
+            position += -position % 8
+            size = struct.calcsize(fmt) * count
+            part = view[position:position + size].cast(fmt)
+            position += size
+            return part
+
+        self.lat = take("d", n)
+        self.lng = take("d", n)
+        self.offsets = take("I", n + 1)
+        self.targets = take("I", m)
+        self.weights = take("f", m)
+        self.cell_keys = take("q", cells)
+        self.cell_starts = take("I", cells + 1)
+        self.landmarks = take("f", k * n)
+
+    def nearest_node(self, lat: float, lng: float) -> Optional[int]:
+        """Closest graph node, searching grid cells in growing rings"""
+        row = math.floor(lat / self.cell_size)
+        col = math.floor(lng / self.cell_size)
+        # Equirectangular distances in degrees of latitude are plenty to pick the nearest node
+        scale = math.cos(math.radians(lat))
+        node_lat, node_lng, cell_keys, cell_starts = self.lat, self.lng, self.cell_keys, self.cell_starts
+        best, best_sq = None, math.inf
+        for ring in range(MAX_SNAP_RINGS + 1):
+            for dr in range(-ring, ring + 1):
+                step = 1 if abs(dr) == ring else 2 * ring
+                for dc in range(-ring, ring + 1, step or 1):
+                    key = ((row + dr) << 32) + (col + dc + (1 << 31))
+                    i = bisect.bisect_left(cell_keys, key)
+                    if i == len(cell_keys) or cell_keys[i] != key:
+                        continue
+                    for node in range(cell_starts[i], cell_starts[i + 1]):
+                        dy = node_lat[node] - lat
+                        dx = (node_lng[node] - lng) * scale
+                        d = dy * dy + dx * dx
+                        if d < best_sq:
+                            best, best_sq = node, d
+            # Nodes beyond this ring are at least `ring` whole cells away (cells are narrowest east-west)
+            reach = ring * self.cell_size * scale
+            if best_sq <= reach * reach:
+                break
+        return best
+
+    def shortest_time(self, source: int, target: int, max_seconds: float = math.inf) -> Optional[float]:
+        """Walking seconds between two nodes by ALT A*; None if unreachable within max_seconds"""
+        if source == target:
+            return 0.0
+        n, landmarks = self.node_count, self.landmarks
+        # (offset into the landmark table, landmark -> target distance) per landmark
+        tables = [(k * n, landmarks[k * n + target]) for k in range(self.landmark_count)]
+
+        def heuristic(v: int) -> float:
+            # Triangle inequality: |d(L, t) - d(L, v)| never overestimates d(v, t)
+            best = 0.0
+            for base, to_target in tables:
+                bound = to_target - landmarks[base + v]
+                if bound < 0:
+                    bound = -bound
+                if bound > best:
+                    best = bound
+            return best
+
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        dist = {source: 0.0}
+        settled = set()
+        heap = [(heuristic(source), source)]
+        while heap:
+            f, u = heapq.heappop(heap)
+            if u == target:
+                return dist[u]
+            if f > max_seconds:
+                return None
+            if u in settled:
+                continue
+            settled.add(u)
+            du = dist[u]
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                nd = du + weights[e]
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd + heuristic(v), v))
+        return None
+
+    def _snap(self, point: Tuple[float, float]) -> Tuple[Optional[int], float]:
+        """Nearest node and the seconds to walk to it in a straight line"""
+        node = self.nearest_node(*point)
+        if node is None:
+            return None, math.inf
+        return node, haversine_m(point[0], point[1], self.lat[node], self.lng[node]) / WALKING_SPEED_MPS
+
+    def walking_times(self, origin: Tuple[float, float], destinations: List[Tuple[float, float]],
+                      max_seconds: float = ROUTING_MAX_MINUTES * 60) -> List[Optional[float]]:
+        """
+        Door-to-door seconds from origin to each destination: the network path
+        between the nearest nodes plus straight-line walks on and off the graph.
+        None where the destination can't be reached within max_seconds.
+        """
+        source, lead_in = self._snap(origin)
+        return [self._door_to_door(source, lead_in, destination, max_seconds) for destination in destinations]
+
+    def _door_to_door(self, source: Optional[int], lead_in: float, destination: Tuple[float, float],
+                      max_seconds: float) -> Optional[float]:
+        target, lead_out = self._snap(destination)
+        if source is None or target is None:
+            return None
+        network = self.shortest_time(source, target, max_seconds - lead_in - lead_out)
+        if network is None:
+            return None
+        return network + lead_in + lead_out
+
+    def closest(self, origin: Tuple[float, float], destinations: List[Tuple[float, float]],
+                k: int, max_seconds: float = ROUTING_MAX_MINUTES * 60) -> List[Tuple[int, float]]:
+        """
+        The k destinations quickest to walk to, as (index, seconds) sorted by time.
+        Walking is never faster than the straight line, so destinations are
+        routed nearest-first and the rest are skipped once their straight-line
+        time can't beat the k-th best walk found so far.
+        """
+        if k <= 0:
+            return []
+        source, lead_in = self._snap(origin)
+        if source is None:
+            return []
+        by_distance = sorted(
+            (haversine_m(origin[0], origin[1], lat, lng) / WALKING_SPEED_MPS, i)
+            for i, (lat, lng) in enumerate(destinations)
+        )
+        best: List[Tuple[float, int]] = []  # Max-heap of the k quickest, as (-seconds, index)
+        for lower_bound, i in by_distance:
+            limit = -best[0][0] if len(best) == k else max_seconds
+            if lower_bound >= limit:
+                break
+            seconds = self._door_to_door(source, lead_in, destinations[i], limit)
+            if seconds is None or seconds >= limit:
+                continue
+            if len(best) == k:
+                heapq.heapreplace(best, (-seconds, i))
+            else:
+                heapq.heappush(best, (-seconds, i))
+        return sorted(((i, -negative) for negative, i in best), key=lambda item: item[1])
+
+
+def load_walking_graph(path: Optional[str] = ROUTING_GRAPH_PATH) -> Optional[WalkingGraph]:
+    """Memory-map the configured graph, or None when routing isn't set up"""
+    if not path:
+        return None
+    try:
+        graph = WalkingGraph(path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"⚠️ Walking graph not loaded from {path}: {e}")
+        return None
+    print(f"✅ Walking graph mapped: {graph.node_count} nodes, {graph.landmark_count} landmarks")
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocess an OSM extract into a walking graph")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Build a graph file from an .osm XML extract")
+    build.add_argument("osm")
+    build.add_argument("-o", "--output", required=True)
+    build.add_argument("--landmarks", type=int, default=8)
+    build.add_argument("--speed", type=float, default=WALKING_SPEED_MPS, help="Flat walking speed in m/s")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    nodes, ways = parse_osm(args.osm)
+    stats = build_graph(nodes, ways, args.output, args.landmarks, speed=args.speed)
+    print(f"✅ Walking graph written to {args.output} in {time.perf_counter() - start:.1f}s: {stats}")
+
+
+if __name__ == "__main__":
+    main()
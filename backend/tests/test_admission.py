@@ -0,0 +1,230 @@
+import asyncio
+
+import pytest
+
+import admission
+from admission import (
+    PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_URGENT,
+    AdmissionController, AdmissionMiddleware, ClientRateLimiter, PriorityLimiter, RoutePolicy, TokenBucket,
+)
+
+
+# ---------- TokenBucket ----------
+
+def test_bucket_allows_burst_then_refills_at_rate():
+    bucket = TokenBucket(rate=2.0, burst=3.0)
+    now = bucket.updated
+    assert [bucket.try_take(now) for _ in range(4)] == [True, True, True, False]
+    assert bucket.retry_after() == pytest.approx(0.5)
+    assert not bucket.try_take(now + 0.25)
+    assert bucket.try_take(now + 0.5)
+    # Idle time never banks more than the burst
+    assert sum(bucket.try_take(now + 100) for _ in range(10)) == 3
+
+
+def test_bucket_without_rate_never_refills():
+    bucket = TokenBucket(rate=0.0, burst=1.0)
+    assert bucket.try_take(bucket.updated)
+    assert not bucket.try_take(bucket.updated + 1000)
+    assert bucket.retry_after() == 60.0
+
+
+def test_client_limiter_keeps_buckets_per_client_and_evicts_lru():
+    limiter = ClientRateLimiter(rate=0.0, burst=1.0, max_clients=2)
+    assert limiter.allow("a")[0]
+    assert not limiter.allow("a")[0]
+    assert limiter.allow("b")[0]
+    limiter.allow("a")  # Touch "a" so "b" is the least recently used
+    assert limiter.allow("c")[0]
+    assert set(limiter._buckets) == {"a", "c"}
+    assert limiter.allow("b")[0]  # Evicted, so it starts with a fresh bucket
+
+
+# ---------- PriorityLimiter ----------
+
+def test_acquires_up_to_capacity_without_waiting():
+    async def scenario():
+        limiter = PriorityLimiter(2)
+        assert await limiter.acquire()
+        assert await limiter.acquire()
+        assert not await limiter.acquire(timeout=0)
+        assert limiter.active == 2
+        limiter.release()
+        assert limiter.active == 1
+
+    asyncio.run(scenario())
+
+
+def test_release_hands_the_slot_to_a_waiter():
+    async def scenario():
+        limiter = PriorityLimiter(1)
+        assert await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire(timeout=1.0))
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        limiter.release()
+        assert await waiter
+        # The slot moved straight to the waiter; nobody can barge in
+        assert limiter.active == 1
+        assert limiter.waiting == 0
+        assert not limiter.try_acquire()
+
+    asyncio.run(scenario())
+
+
+def test_waiters_are_served_by_priority_then_fifo():
+    async def scenario():
+        limiter = PriorityLimiter(1)
+        await limiter.acquire()
+        order = []
+
+        async def wait(name, priority):
+            assert await limiter.acquire(priority, timeout=1.0)
+            order.append(name)
+
+        tasks = []
+        for name, priority in [("low", PRIORITY_LOW), ("normal-1", PRIORITY_NORMAL),
+                               ("urgent", PRIORITY_URGENT), ("normal-2", PRIORITY_NORMAL),
+                               ("high", PRIORITY_HIGH)]:
+            tasks.append(asyncio.create_task(wait(name, priority)))
+            await asyncio.sleep(0)
+        for _ in tasks:
+            limiter.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        assert order == ["urgent", "high", "normal-1", "normal-2", "low"]
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_waiter_gives_up_its_place():
+    async def scenario():
+        limiter = PriorityLimiter(1)
+        await limiter.acquire()
+        assert not await limiter.acquire(timeout=0.01)
+        assert limiter.waiting == 0
+        limiter.release()
+        assert limiter.active == 0  # No stale waiter was handed the slot
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def scenario():
+        limiter = PriorityLimiter(1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire(timeout=1.0))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.waiting == 0
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_slot_granted_while_giving_up_is_passed_on():
+    async def scenario():
+        limiter = PriorityLimiter(1)
+        await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire(timeout=1.0))
+        second = asyncio.create_task(limiter.acquire(timeout=1.0))
+        await asyncio.sleep(0)
+        # Grant the first waiter its slot, then cancel it before it wakes up
+        limiter.release()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await second
+        assert limiter.active == 1
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_estimated_wait_counts_waiters_at_or_above_priority():
+    async def scenario():
+        limiter = PriorityLimiter(2, initial_service_time=0.1)
+        assert limiter.estimated_wait(PRIORITY_NORMAL) == 0.0
+        await limiter.acquire()
+        await limiter.acquire()
+        tasks = [asyncio.create_task(limiter.acquire(p, timeout=1.0))
+                 for p in (PRIORITY_LOW, PRIORITY_HIGH, PRIORITY_HIGH)]
+        await asyncio.sleep(0)
+        assert limiter.estimated_wait(PRIORITY_URGENT) == pytest.approx(0.05)
+        assert limiter.estimated_wait(PRIORITY_HIGH) == pytest.approx(0.15)
+        assert limiter.estimated_wait(PRIORITY_LOW) == pytest.approx(0.2)
+        limiter.release(elapsed=0.6)
+        assert limiter.service_time == pytest.approx(0.2)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+# ---------- Middleware ----------
+
+def _call(middleware, client="10.0.0.1", headers=()):
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    scope = {"type": "http", "method": "POST", "path": "/work", "client": (client, 1), "headers": list(headers)}
+    asyncio.run(middleware(scope, receive, send))
+    return statuses[0]
+
+
+def _middleware(**policy):
+    controller = AdmissionController([RoutePolicy(name="work", prefix="/work", exact=True, **policy)])
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    return AdmissionMiddleware(app, controller), controller
+
+
+def test_over_rate_clients_get_429(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_ENABLED", True)
+    middleware, controller = _middleware(client_rate=0.0, client_burst=1.0)
+    assert _call(middleware) == 200
+    assert _call(middleware) == 429
+    assert _call(middleware, client="10.0.0.2") == 200
+    assert controller.shed_counts["work"]["rateLimited"] == 1
+
+
+def test_demoted_over_rate_clients_are_still_served(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_ENABLED", True)
+    middleware, controller = _middleware(client_rate=0.0, client_burst=1.0, demote_over_rate=True)
+    assert [_call(middleware) for _ in range(3)] == [200, 200, 200]
+    assert controller.shed_counts["work"] == {"rateLimited": 0, "demoted": 2, "shed": 0}
+
+
+def test_priority_header_needs_trusted_token(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_TRUSTED_TOKEN", "secret")
+    urgent = (b"x-priority", b"urgent")
+    assert admission._request_priority({"headers": [urgent]}, PRIORITY_NORMAL) == PRIORITY_NORMAL
+    assert admission._request_priority(
+        {"headers": [urgent, (b"x-admin-token", b"wrong")]}, PRIORITY_NORMAL) == PRIORITY_NORMAL
+    assert admission._request_priority(
+        {"headers": [urgent, (b"x-admin-token", b"secret")]}, PRIORITY_NORMAL) == PRIORITY_URGENT
+    assert admission._request_priority({"headers": [(b"x-priority", b"low")]}, PRIORITY_HIGH) == PRIORITY_LOW
+
+
+def test_deadline_header_only_shortens():
+    def deadline(value):
+        return admission._request_deadline({"headers": [(b"x-request-timeout-ms", value)]}, 2.0)
+
+    assert deadline(b"500") == 0.5
+    assert deadline(b"60000") == 2.0
+    assert deadline(b"-5") == 0.0
+    assert deadline(b"soon") == 2.0
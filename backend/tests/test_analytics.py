@@ -0,0 +1,163 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+import analytics
+from analytics import (
+    ALL, LONGEST_WINDOW, DemandAggregator, SlidingCounter, TumblingCounter, WindowSpec, cell_bounds, cell_for,
+)
+from benchmarks.common import main
+
+T0 = 2811 * 7 * 24 * 3600.0  # Aligned to every window size
+SPEC = WindowSpec("1m", 60, 10)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable time.time() for the aggregator"""
+    now = [T0]
+    monkeypatch.setattr(analytics.time, "time", lambda: now[0])
+    return now
+
+
+# ---------- SlidingCounter ----------
+
+def test_sliding_buckets_expire_one_at_a_time():
+    counter = SlidingCounter(SPEC)
+    counter.add(T0)
+    counter.add(T0 + 25)
+    counter.add(T0 + 25)
+    assert counter.value(T0 + 30) == 3
+    assert counter.value(T0 + 59) == 3
+    assert counter.value(T0 + 60) == 2  # The T0 bucket has left the window
+    assert counter.value(T0 + 79) == 2
+    assert counter.value(T0 + 80) == 0
+
+
+def test_sliding_counter_resets_after_a_long_gap():
+    counter = SlidingCounter(SPEC)
+    counter.add(T0, count=5)
+    assert counter.value(T0 + 10 * 60) == 0
+    counter.add(T0 + 10 * 60)
+    assert counter.value(T0 + 10 * 60) == 1
+    assert sum(counter.counts) == counter.total
+
+
+def test_late_events_count_only_inside_the_window():
+    counter = SlidingCounter(SPEC)
+    counter.add(T0 + 100)
+    counter.add(T0 + 55)  # Late, but its bucket is still in the window
+    counter.add(T0 + 20)  # Too late: that bucket has already expired
+    assert counter.value(T0 + 100) == 2
+    assert counter.value(T0 + 110) == 1  # The late event's bucket expires first
+
+
+# ---------- TumblingCounter ----------
+
+def test_tumbling_rolls_current_into_previous():
+    counter = TumblingCounter(60)
+    counter.add(T0)
+    counter.add(T0 + 59)
+    assert counter.value(T0 + 30) == (T0, 2, 0)
+    counter.add(T0 + 61)
+    assert counter.value(T0 + 90) == (T0 + 60, 1, 2)
+    # Skipping a whole window clears both
+    assert counter.value(T0 + 185) == (T0 + 180, 0, 0)
+
+
+def test_tumbling_late_events_land_in_their_window():
+    counter = TumblingCounter(60)
+    counter.add(T0 + 70)
+    counter.add(T0 + 50)  # Previous window
+    counter.add(T0 - 30)  # Two windows back: dropped
+    assert counter.value(T0 + 70) == (T0 + 60, 1, 1)
+
+
+# ---------- DemandAggregator ----------
+
+def test_record_updates_every_rollup(clock):
+    aggregator = DemandAggregator()
+    aggregator.record(37.775, -122.419, "Food")
+    aggregator.record(37.775, -122.419, "shelter")
+    aggregator.record(37.801, -122.41, "food")
+    cell = cell_for(37.775, -122.419)
+    assert aggregator.query(cell, "food")["5m"]["sliding"] == 1
+    assert aggregator.query(cell)["5m"]["sliding"] == 2
+    assert aggregator.query(category="FOOD")["1h"]["sliding"] == 2
+    assert aggregator.query()["7d"]["sliding"] == 3
+    assert aggregator.query("0:0")["7d"]["sliding"] == 0
+
+
+def test_windows_expire_with_the_clock(clock):
+    aggregator = DemandAggregator()
+    aggregator.record(37.775, -122.419, "food")
+    clock[0] += 10 * 60
+    windows = aggregator.query()
+    assert windows["5m"]["sliding"] == 0
+    assert windows["1h"]["sliding"] == 1
+    assert windows["5m"]["tumbling"]["previous"] == 0
+    assert windows["1h"]["tumbling"]["start"] == datetime.fromtimestamp(T0).isoformat()
+
+
+def test_events_older_than_the_longest_window_are_ignored(clock):
+    aggregator = DemandAggregator()
+    aggregator.record(37.775, -122.419, "food", at=datetime.fromtimestamp(T0 - LONGEST_WINDOW))
+    assert len(aggregator) == 0
+    aggregator.record(37.775, -122.419, "food", at=datetime.fromtimestamp(T0 - 3600))
+    windows = aggregator.query()
+    assert windows["5m"]["sliding"] == 0
+    assert windows["1d"]["sliding"] == 1
+
+
+def test_prune_drops_keys_without_recent_events(clock):
+    aggregator = DemandAggregator(prune_every=3)
+    aggregator.record(37.775, -122.419, "food")
+    assert len(aggregator) == 4  # (cell, food), (cell, *), (*, food), (*, *)
+    clock[0] += LONGEST_WINDOW
+    aggregator.record(37.801, -122.41, "shelter")
+    assert len(aggregator) == 7  # Not yet: prune runs on every third record
+    aggregator.record(37.801, -122.41, "shelter")
+    assert len(aggregator) == 4
+    assert aggregator.query(category="food")["7d"]["sliding"] == 0
+    assert aggregator.query()["7d"]["sliding"] == 2
+
+
+def test_vs_longest_average(clock):
+    aggregator = DemandAggregator()
+    for _ in range(2):
+        aggregator.record(37.775, -122.419, "food")
+    windows = aggregator.query()
+    assert windows["7d"]["vsLongestAverage"] == 1.0
+    assert windows["5m"]["vsLongestAverage"] == round(2 / (2 * 300 / LONGEST_WINDOW), 2)
+    assert DemandAggregator().query()["5m"]["vsLongestAverage"] is None
+
+
+# ---------- Cells and /api/trends ----------
+
+def test_cell_bounds_contain_the_point():
+    cell = cell_for(37.7749, -122.4194)
+    bounds = cell_bounds(cell)
+    assert bounds["south"] <= 37.7749 < bounds["north"]
+    assert bounds["west"] <= -122.4194 < bounds["east"]
+
+
+@pytest.mark.parametrize("cell", ["3778", "a:b", "1:2:3", "1.5:2"])
+def test_trends_rejects_malformed_cells(cell):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main.get_trends(cell=cell))
+    assert error.value.status_code == 400
+
+
+def test_trends_by_point_and_cell(monkeypatch):
+    monkeypatch.setattr(main, "demand_trends", DemandAggregator())
+    main.demand_trends.record(37.7749, -122.4194, "food")
+    by_point = asyncio.run(main.get_trends(category="food", lat=37.7749, lng=-122.4194))
+    assert by_point["cell"] == cell_for(37.7749, -122.4194)
+    assert by_point["windows"]["5m"]["sliding"] == 1
+    by_cell = asyncio.run(main.get_trends(cell=by_point["cell"]))
+    assert by_cell["bounds"] == by_point["bounds"]
+    assert by_cell["windows"]["1h"]["sliding"] == 1
+    city = asyncio.run(main.get_trends())
+    assert (city["cell"], city["bounds"], city["category"]) == (ALL, None, ALL)
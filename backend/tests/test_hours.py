@@ -0,0 +1,123 @@
+from datetime import datetime
+
+import pytest
+
+from hours import FULL_WEEK, WeeklySchedule, parse_hours
+
+# 2024-01-01 is a Monday
+MON = datetime(2024, 1, 1)
+
+
+def at(day: int, hour: int, minute: int = 0) -> datetime:
+    return MON.replace(day=1 + day, hour=hour, minute=minute)
+
+
+def open_hours(schedule: WeeklySchedule, day: int):
+    """(first, last) open half-hour on a day, or None"""
+    slots = [h * 60 + m for h in range(24) for m in (0, 30) if schedule.is_open(at(day, h, m))]
+    return (divmod(slots[0], 60), divmod(slots[-1], 60)) if slots else None
+
+
+def test_weekday_range_with_suffixes():
+    schedule = parse_hours("Mon-Fri 9am-5pm")
+    assert open_hours(schedule, 0) == ((9, 0), (16, 30))
+    assert open_hours(schedule, 4) == ((9, 0), (16, 30))
+    assert open_hours(schedule, 5) is None
+
+
+@pytest.mark.parametrize("hours", ["Mon, Wed, Fri 9-5", "Mon, Wed, Fri 9am-5"])
+def test_bare_hours_are_a_daytime_range(hours):
+    schedule = parse_hours(hours)
+    assert open_hours(schedule, 0) == ((9, 0), (16, 30))
+    assert not schedule.is_open(at(1, 3))  # Not open overnight into Tuesday
+    assert open_hours(schedule, 1) is None
+
+
+def test_bare_range_past_noon():
+    assert open_hours(parse_hours("Daily 10-2"), 3) == ((10, 0), (13, 30))
+
+
+@pytest.mark.parametrize("hours", ["Daily 22-6", "Daily 10pm-6am"])
+def test_overnight_ranges_wrap_to_next_day(hours):
+    schedule = parse_hours(hours)
+    assert schedule.is_open(at(0, 23))
+    assert schedule.is_open(at(1, 5, 55))
+    assert not schedule.is_open(at(1, 6))
+    assert not schedule.is_open(at(0, 12))
+
+
+def test_sunday_overnight_wraps_to_monday():
+    schedule = parse_hours("Sun 8pm-2am")
+    assert schedule.is_open(at(6, 21))
+    assert schedule.is_open(at(0, 1))
+    assert not schedule.is_open(at(0, 3))
+
+
+def test_ranges_without_days_reuse_previous_days():
+    schedule = parse_hours("Mon-Fri 9am-12pm, 1pm-5pm")
+    assert schedule.is_open(at(2, 10))
+    assert not schedule.is_open(at(2, 12, 30))
+    assert schedule.is_open(at(2, 14))
+    assert not schedule.is_open(at(5, 10))
+
+
+@pytest.mark.parametrize("hours", ["9am-5pm Mon-Fri", "9-5 on weekdays", "9am-5pm, Mon-Fri"])
+def test_days_after_the_times(hours):
+    schedule = parse_hours(hours)
+    assert open_hours(schedule, 0) == ((9, 0), (16, 30))
+    assert not schedule.is_open(at(5, 11))  # Closed Saturday
+    assert open_hours(schedule, 6) is None
+
+
+def test_trailing_days_per_range():
+    schedule = parse_hours("9am-5pm Mon-Fri, 10am-2pm Sat")
+    assert open_hours(schedule, 4) == ((9, 0), (16, 30))
+    assert open_hours(schedule, 5) == ((10, 0), (13, 30))
+    assert open_hours(schedule, 6) is None
+
+
+def test_ranges_without_days_share_trailing_days():
+    schedule = parse_hours("9am-12pm, 1pm-5pm Mon-Fri")
+    assert schedule.is_open(at(0, 10))
+    assert schedule.is_open(at(0, 14))
+    assert not schedule.is_open(at(5, 10))
+
+
+def test_closed_days_are_left_out():
+    schedule = parse_hours("Daily 9-5, closed Sun")
+    assert open_hours(schedule, 5) == ((9, 0), (16, 30))
+    assert open_hours(schedule, 6) is None
+
+
+@pytest.mark.parametrize("hours", ["9-5 except Sunday", "10am-2pm first Saturday of the month"])
+def test_unaccounted_day_words_are_unparseable(hours):
+    assert parse_hours(hours) is None
+
+
+@pytest.mark.parametrize("hours", ["24/7", "Open 24 hours", "always open"])
+def test_always_open(hours):
+    assert parse_hours(hours).mask == FULL_WEEK
+
+
+@pytest.mark.parametrize("hours", [None, "", "By appointment", "call ahead"])
+def test_unparseable_hours(hours):
+    assert parse_hours(hours) is None
+
+
+def test_next_open_and_close():
+    schedule = parse_hours("Tue-Thu 6pm-9pm")
+    assert schedule.next_open(at(0, 12)) == at(1, 18)
+    assert schedule.next_close(at(0, 12)) is None
+    assert schedule.next_close(at(1, 19, 7)) == at(1, 21)
+    assert schedule.next_open(at(1, 19)) is None
+
+
+def test_next_open_wraps_past_sunday():
+    schedule = parse_hours("Mon 9am-10am")
+    assert schedule.next_open(at(6, 12)) == datetime(2024, 1, 8, 9, 0)
+
+
+def test_always_open_has_no_transitions():
+    schedule = parse_hours("24/7")
+    assert schedule.next_open(MON) is None
+    assert schedule.next_close(MON) is None
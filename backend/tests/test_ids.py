@@ -0,0 +1,143 @@
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+import ids
+from ids import (
+    EPOCH_MS, MAX_SEQUENCE, MAX_WORKER_ID, SnowflakeGenerator, TimeOrderedIndex,
+    compose_id, format_id, id_timestamp_ms, parse_id,
+)
+
+
+def test_ids_are_unique_and_increasing():
+    generator = SnowflakeGenerator(worker_id=3)
+    values = [generator.next_id() for _ in range(20000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_ids_are_unique_across_threads():
+    generator = SnowflakeGenerator(worker_id=1)
+    results = [[] for _ in range(8)]
+
+    def work(out):
+        out.extend(generator.next_id() for _ in range(2000))
+
+    threads = [threading.Thread(target=work, args=(out,)) for out in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    values = [value for out in results for value in out]
+    assert len(set(values)) == len(values)
+
+
+def test_clock_stepping_back_does_not_repeat(monkeypatch):
+    clock = iter([1_800_000_000.000, 1_800_000_000.000, 1_799_999_999.000, 1_800_000_000.001])
+    monkeypatch.setattr(ids.time, "time", lambda: next(clock))
+    generator = SnowflakeGenerator(worker_id=0)
+    values = [generator.next_id() for _ in range(4)]
+    assert values == sorted(values)
+    assert len(set(values)) == 4
+
+
+def test_sequence_overflow_borrows_next_millisecond(monkeypatch):
+    monkeypatch.setattr(ids.time, "time", lambda: 1_800_000_000.0)
+    generator = SnowflakeGenerator(worker_id=0)
+    values = [generator.next_id() for _ in range(MAX_SEQUENCE + 2)]
+    assert len(set(values)) == len(values)
+    assert id_timestamp_ms(values[-1]) == id_timestamp_ms(values[0]) + 1
+
+
+def test_worker_ids_keep_generators_apart(monkeypatch):
+    monkeypatch.setattr(ids.time, "time", lambda: 1_800_000_000.0)
+    a, b = SnowflakeGenerator(worker_id=1), SnowflakeGenerator(worker_id=2)
+    assert a.next_id() != b.next_id()
+
+
+@pytest.mark.parametrize("worker_id", [-1, MAX_WORKER_ID + 1])
+def test_invalid_worker_id(worker_id):
+    with pytest.raises(ValueError):
+        SnowflakeGenerator(worker_id=worker_id)
+
+
+def test_format_and_parse_round_trip():
+    value = compose_id(EPOCH_MS + 123456, worker_id=5, sequence=7)
+    text = format_id("req", value)
+    assert len(text) == len("req-") + 19
+    assert parse_id(text) == value
+    assert id_timestamp_ms(value) == EPOCH_MS + 123456
+    assert parse_id("req-1") is None
+
+
+def test_formatted_ids_sort_like_numbers():
+    small, large = compose_id(EPOCH_MS + 1), compose_id(EPOCH_MS + 10**9)
+    assert format_id("req", small) < format_id("req", large)
+
+
+def test_claimed_worker_id_respects_env(monkeypatch):
+    monkeypatch.setattr(ids, "_claimed", {})
+    monkeypatch.setenv("WORKER_ID", "42")
+    assert ids.claim_worker_id() == 42
+    assert SnowflakeGenerator().worker_id == 42
+
+
+def test_claimed_worker_ids_skip_locked_ones(monkeypatch, tmp_path):
+    monkeypatch.delenv("WORKER_ID", raising=False)
+    monkeypatch.setattr(ids, "WORKER_ID_LOCK_DIR", str(tmp_path))
+    monkeypatch.setattr(ids, "_lock_files", [])
+    first = ids._lock_free_worker_id()
+    second = ids._lock_free_worker_id()  # Same process, new file description: still exclusive
+    assert first != second
+    for handle in ids._lock_files:
+        handle.close()
+
+
+def _request(request_id: str, timestamp: str):
+    return {"id": request_id, "timestamp": timestamp}
+
+
+def test_range_queries_by_time():
+    index = TimeOrderedIndex()
+    base = int(datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp() * 1000)
+    for minute in range(5):
+        value = compose_id(base + minute * 60000)
+        index.add(_request(format_id("req", value), "unused"))
+    start = datetime(2024, 6, 1, 0, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 6, 1, 0, 3, tzinfo=timezone.utc)
+    results = index.range(start, end)
+    assert [id_timestamp_ms(parse_id(r["id"])) for r in results] == [base + 120000, base + 60000]
+
+
+def test_range_mixes_legacy_ids_with_aware_and_naive_bounds():
+    index = TimeOrderedIndex()
+    index.add(_request("req-1", "2024-01-01T10:00:00"))
+    assert len(index.range(datetime(2020, 1, 1, tzinfo=timezone.utc))) == 1
+    assert len(index.range(datetime(2020, 1, 1))) == 1
+    assert index.range(end=datetime(2020, 1, 1, tzinfo=timezone.utc)) == []
+    assert index.get("req-1")["timestamp"] == "2024-01-01T10:00:00"
+
+
+def test_legacy_requests_merge_into_time_order(monkeypatch):
+    index = TimeOrderedIndex()
+    base = int(datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp() * 1000)
+    for minute in (0, 2, 4):
+        index.add(_request(format_id("req", compose_id(base + minute * 60000)), "unused"))
+    for name, minute in [("legacy-3", 3), ("legacy-1", 1), ("legacy-late", 9)]:
+        moment = datetime.fromtimestamp((base + minute * 60000) / 1000, timezone.utc)
+        index.add(_request(name, moment.isoformat()))
+
+    def order(results):
+        return [r["id"] if r["id"].startswith("legacy") else id_timestamp_ms(parse_id(r["id"])) for r in results]
+
+    assert order(index.range()) == [
+        "legacy-late", base + 240000, "legacy-3", base + 120000, "legacy-1", base,
+    ]
+    start = datetime.fromtimestamp((base + 60000) / 1000, timezone.utc)
+    end = datetime.fromtimestamp((base + 240000) / 1000, timezone.utc)
+    assert order(index.range(start, end)) == ["legacy-3", base + 120000, "legacy-1"]
+
+    # Timestamps are only parsed when requests are added
+    monkeypatch.setattr(ids, "datetime", None)
+    assert order(index.range(end=start)) == [base]
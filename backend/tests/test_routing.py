@@ -0,0 +1,116 @@
+import math
+import random
+
+import pytest
+
+import routing
+from routing import WalkingGraph, _dijkstra_all, build_graph, haversine_m
+
+ROWS, COLS = 12, 12
+STEP = 0.0009  # ~100m blocks
+SOUTH, WEST = 37.75, -122.45
+BARRIER_COL = 6  # East-west streets only cross it on rows 0 and 6
+
+
+def grid_node(r: int, c: int) -> int:
+    return r * COLS + c + 1
+
+
+@pytest.fixture(scope="module")
+def graph(tmp_path_factory):
+    rng = random.Random(7)
+    nodes = {
+        grid_node(r, c): (SOUTH + r * STEP, WEST + c * STEP, rng.uniform(0, 40))
+        for r in range(ROWS) for c in range(COLS)
+    }
+    ways = [[grid_node(r, c) for r in range(ROWS)] for c in range(COLS)]
+    for r in range(ROWS):
+        for c in range(COLS - 1):
+            if c != BARRIER_COL or r % 6 == 0:
+                ways.append([grid_node(r, c), grid_node(r, c + 1)])
+    # An island that isn't connected to the grid is dropped
+    nodes[9001] = (SOUTH - 0.01, WEST, None)
+    nodes[9002] = (SOUTH - 0.01, WEST + STEP, None)
+    ways.append([9001, 9002])
+
+    path = str(tmp_path_factory.mktemp("routing") / "grid.graph")
+    stats = build_graph(nodes, ways, path, landmarks=4)
+    assert stats["nodes"] == ROWS * COLS
+    return WalkingGraph(path)
+
+
+def point(r: float, c: float):
+    return (SOUTH + r * STEP, WEST + c * STEP)
+
+
+def test_alt_matches_dijkstra(graph):
+    rng = random.Random(1)
+    for _ in range(100):
+        source, target = rng.randrange(graph.node_count), rng.randrange(graph.node_count)
+        expected = _dijkstra_all(graph.offsets, graph.targets, graph.weights, source)[target]
+        assert graph.shortest_time(source, target) == pytest.approx(expected, rel=1e-9)
+
+
+def test_shortest_time_gives_up_past_max_seconds(graph):
+    source = graph.nearest_node(*point(0, 0))
+    target = graph.nearest_node(*point(ROWS - 1, COLS - 1))
+    full = graph.shortest_time(source, target)
+    assert graph.shortest_time(source, target, max_seconds=full / 2) is None
+    assert graph.shortest_time(source, source) == 0.0
+
+
+def test_nearest_node_matches_brute_force(graph):
+    rng = random.Random(2)
+    for _ in range(50):
+        lat, lng = point(rng.uniform(-1, ROWS), rng.uniform(-1, COLS))
+        scale = math.cos(math.radians(lat))
+        expected = min(
+            range(graph.node_count),
+            key=lambda n: (graph.lat[n] - lat) ** 2 + ((graph.lng[n] - lng) * scale) ** 2,
+        )
+        assert graph.nearest_node(lat, lng) == expected
+
+
+def test_nearest_node_is_none_far_from_streets(graph):
+    assert graph.nearest_node(SOUTH + 1, WEST) is None
+    assert graph.walking_times((SOUTH + 1, WEST), [point(0, 0)]) == [None]
+
+
+def test_walking_time_detours_around_barrier(graph):
+    origin, across = point(3, BARRIER_COL), point(3, BARRIER_COL + 1)
+    (seconds,) = graph.walking_times(origin, [across])
+    straight = haversine_m(*origin, *across) / routing.WALKING_SPEED_MPS
+    assert seconds > 4 * straight  # Up to row 0 or 6 and back
+
+
+def test_closest_matches_brute_force(graph):
+    rng = random.Random(3)
+    for _ in range(20):
+        origin = point(rng.uniform(0, ROWS - 1), rng.uniform(0, COLS - 1))
+        destinations = [point(rng.uniform(0, ROWS - 1), rng.uniform(0, COLS - 1)) for _ in range(15)]
+        times = graph.walking_times(origin, destinations)
+        expected = sorted(((i, t) for i, t in enumerate(times) if t is not None), key=lambda item: item[1])[:4]
+        result = graph.closest(origin, destinations, 4)
+        assert [i for i, _ in result] == [i for i, _ in expected]
+        assert [t for _, t in result] == pytest.approx([t for _, t in expected])
+
+
+def test_closest_drops_walks_over_max_seconds(graph):
+    origin = point(0, 0)
+    destinations = [point(0, 1), point(ROWS - 1, COLS - 1)]
+    result = graph.closest(origin, destinations, 2, max_seconds=300)
+    assert [i for i, _ in result] == [0]
+
+
+def test_closest_with_no_slots(graph):
+    assert graph.closest(point(0, 0), [point(0, 1)], 0) == []
+    assert graph.closest(point(0, 0), [point(0, 1)], -1) == []
+    assert graph.closest(point(0, 0), [], 3) == []
+
+
+def test_slopes_never_speed_walking_up():
+    flat = routing.walking_seconds(100)
+    assert routing.walking_seconds(100, 0) == pytest.approx(flat)
+    for rise in (-20, -5, 5, 20):
+        assert routing.walking_seconds(100, rise) >= flat
+        assert routing.walking_seconds(100, rise) == pytest.approx(routing.walking_seconds(100, -rise))
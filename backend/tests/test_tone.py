@@ -0,0 +1,38 @@
+import pytest
+
+from tone_classifier import DISTRESS_CUES, TONE_LEXICON, ToneClassifier, distress_cues, featurize
+
+
+def test_lexicons_have_no_duplicates():
+    for cues in [*TONE_LEXICON.values(), DISTRESS_CUES]:
+        assert len(cues) == len(set(cues))
+
+
+@pytest.mark.parametrize("text, cues", [
+    ("There is a gun", ["a gun"]),
+    ("Could you recommend a clinic, I overdosed", ["overdosed"]),
+    ("My friend is NOT breathing", ["not breathing"]),
+    ("He keeps hitting me", ["hitting me"]),
+])
+def test_distress_cues_match_whole_phrases(text, cues):
+    assert distress_cues(text) == cues
+
+
+@pytest.mark.parametrize("text", [
+    "My phone battery will die soon",
+    "My feet hurt from walking",
+    "Where can I pick up my pills?",
+    "Is the shelter gunning for more volunteers?",
+])
+def test_bare_words_are_not_distress_cues(text):
+    assert distress_cues(text) == []
+
+
+def test_lexicon_hits_count_each_cue_once():
+    assert featurize("there is a gun")["lex:Distressed"] == 1.0
+
+
+def test_shipped_model_flags_clear_distress():
+    model = ToneClassifier.load()
+    for text in ["I want to kill myself", "Someone is chasing me with a knife"]:
+        assert model.classify(text)[0] == "Distressed"
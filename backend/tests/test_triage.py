@@ -0,0 +1,106 @@
+import random
+
+from triage import IndexedHeap, TriageQueue
+
+
+def assert_heap_invariants(heap: IndexedHeap):
+    entries = heap._heap
+    for i, (key, item_id) in enumerate(entries):
+        assert heap._pos[item_id] == i
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < len(entries):
+                assert not entries[child][0] < key
+    assert len(heap._pos) == len(entries)
+
+
+def test_pop_returns_items_in_key_order():
+    heap = IndexedHeap()
+    for item_id, key in [("a", 5), ("b", 1), ("c", 3), ("d", 4), ("e", 2)]:
+        heap.push(item_id, key)
+    assert [heap.pop()[1] for _ in range(5)] == ["b", "e", "c", "d", "a"]
+    assert heap.pop() is None
+    assert heap.peek() is None
+
+
+def test_update_moves_items_both_ways():
+    heap = IndexedHeap()
+    for i in range(10):
+        heap.push(i, i)
+    heap.update(9, -1)  # Decrease-key to the top
+    heap.push(0, 100)  # Pushing a known id changes its key
+    assert heap.peek() == (-1, 9)
+    assert heap.key_of(0) == 100
+    assert_heap_invariants(heap)
+    assert [item_id for _, item_id in heap.top_k(len(heap))][-1] == 0
+
+
+def test_remove_from_the_middle_and_missing_items():
+    heap = IndexedHeap()
+    for i in range(20):
+        heap.push(i, (i * 7) % 20)
+    assert heap.remove(5)
+    assert not heap.remove(5)
+    assert 5 not in heap
+    assert len(heap) == 19
+    assert_heap_invariants(heap)
+
+
+def test_top_k_matches_sorting_without_mutating():
+    rng = random.Random(3)
+    heap = IndexedHeap()
+    for i in range(200):
+        heap.push(i, rng.random())
+    expected = sorted(heap._heap)
+    assert heap.top_k(10) == expected[:10]
+    assert heap.top_k(500) == expected
+    assert heap.top_k(0) == []
+    assert len(heap) == 200
+
+
+def test_random_operations_keep_invariants():
+    rng = random.Random(7)
+    heap = IndexedHeap()
+    reference = {}
+    for _ in range(2000):
+        op = rng.random()
+        item_id = rng.randrange(100)
+        if op < 0.5:
+            key = rng.randrange(1000)
+            heap.push(item_id, key)
+            reference[item_id] = key
+        elif op < 0.8:
+            assert heap.remove(item_id) == (reference.pop(item_id, None) is not None)
+        elif reference:
+            key, popped = heap.pop()
+            assert key == min(reference.values())
+            assert reference.pop(popped) == key
+        assert_heap_invariants(heap)
+    assert sorted(heap._heap) == sorted((k, i) for i, k in reference.items())
+
+
+def request(request_id: str, score: int, status: str = "open", timestamp: str = "2024-01-01T10:00:00"):
+    return {"id": request_id, "safetyScore": score, "status": status, "timestamp": timestamp}
+
+
+def test_triage_orders_by_score_status_then_age():
+    queue = TriageQueue()
+    queue.sync(request("low", 1))
+    queue.sync(request("new", 3, timestamp="2024-01-01T11:00:00"))
+    queue.sync(request("old", 3, timestamp="2024-01-01T09:00:00"))
+    queue.sync(request("urgent", 3, status="urgent", timestamp="2024-01-01T12:00:00"))
+    assert [r["id"] for r in queue.top(4)] == ["urgent", "old", "new", "low"]
+
+
+def test_triage_resync_reprioritises_and_drops_closed_requests():
+    queue = TriageQueue()
+    first, second = request("a", 1), request("b", 2)
+    queue.sync(first)
+    queue.sync(second)
+    first["safetyScore"] = 5
+    queue.sync(first)
+    assert queue.top(1)[0]["id"] == "a"
+    second["status"] = "resolved"
+    queue.sync(second)
+    assert len(queue) == 1
+    assert queue.claim()["id"] == "a"
+    assert queue.claim() is None
@@ -0,0 +1,230 @@
+"""
+Local tone classifier
+Keyword lexicon plus a small multinomial logistic regression over sparse
+text features. Trained offline into tone_model.json and loaded at startup,
+so most texts are classified in microseconds without calling Gemini.
+
+Retrain with:
+    python tone_classifier.py data/tone_training.csv -o tone_model.json
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import re
+from typing import Dict, List, Optional, Tuple
+
+TONES = ["Calm", "Anxious", "Distressed"]
+
+TONE_MODEL_PATH = os.getenv("TONE_MODEL_PATH", os.path.join(os.path.dirname(__file__), "tone_model.json"))
+TONE_CONFIDENCE_THRESHOLD = float(os.getenv("TONE_CONFIDENCE_THRESHOLD", "0.75"))
+
+# Hand-curated cue words; each hit is one feature for its tone
+TONE_LEXICON: Dict[str, List[str]] = {
+    "Distressed": [
+        "emergency", "danger", "terrified", "bleeding", "blood", "attacked", "assaulted",
+        "suicidal", "suicide", "kill", "dying", "die", "overdose", "overdosed", "hurt",
+        "knife", "gun", "beaten", "hitting", "abuse", "crisis", "desperate", "hopeless",
+        "hypothermia", "collapsing", "unconscious", "pills", "chased", "panic", "panicking",
+        "can't breathe", "end it", "can't go on", "can't take", "stabbed", "raped", "choked",
+        "choking", "seizure", "not breathing", "passed out", "kill myself",
+    ],
+    "Anxious": [
+        "worried", "worry", "nervous", "scared", "afraid", "stressed", "stress",
+        "anxious", "overwhelmed", "uneasy", "evicted", "eviction", "running out",
+        "running low", "not sure", "don't know", "soon", "hurry", "tonight", "losing", "lost",
+    ],
+    "Calm": [
+        "information", "info", "wondering", "thanks", "thank", "hours", "address",
+        "directions", "okay", "fine", "safe", "appointment", "next week", "next month",
+        "recommend", "would like", "could you", "looking for",
+    ],
+}
+
+# Cues that mean distress wherever they appear, so they override a calmer
+# model answer. Bare words like "die", "hurt" or "pills" stay model features
+# only ("my phone battery will die soon")
+DISTRESS_CUES: List[str] = [
+    "suicidal", "suicide", "kill myself", "end my life", "end it all", "want to die", "can't go on",
+    "overdose", "overdosed", "took too many pills", "took pills", "bleeding", "stabbed", "raped",
+    "assaulted", "attacked", "beaten", "hurt me", "hurting me", "hitting me", "kill me", "hurt myself",
+    "a gun", "a knife", "not breathing", "can't breathe", "choking", "choked", "passed out",
+    "unconscious", "seizure", "collapsing", "hypothermia",
+]
+
+_TOKEN_RE = re.compile(r"[a-z']+")
+
+
+def _padded_tokens(tokens: List[str]) -> str:
+    return f" {' '.join(tokens)} "
+
+
+def distress_cues(text: str) -> List[str]:
+    """Unambiguous distress cues (DISTRESS_CUES) present in the text"""
+    padded = _padded_tokens(_TOKEN_RE.findall(text.lower()))
+    return [cue for cue in DISTRESS_CUES if f" {cue} " in padded]
+
+
+def featurize(text: str) -> Dict[str, float]:
+    """Sparse features: unigrams, bigrams, lexicon hits and a few style cues"""
+    lowered = text.lower()
+    tokens = _TOKEN_RE.findall(lowered)
+    features: Dict[str, float] = {"bias": 1.0}
+    for token in tokens:
+        features[f"w:{token}"] = 1.0
+    for first, second in zip(tokens, tokens[1:]):
+        features[f"b:{first}_{second}"] = 1.0
+
+    padded = _padded_tokens(tokens)
+    for tone, cues in TONE_LEXICON.items():
+        hits = sum(1 for cue in cues if f" {cue} " in padded)
+        if hits:
+            features[f"lex:{tone}"] = float(hits)
+
+    exclamations = text.count("!")
+    if exclamations:
+        features["style:exclaim"] = min(exclamations, 3) / 3
+    shouted = sum(1 for word in text.split() if len(word) > 2 and word.isupper())
+    if shouted:
+        features["style:shout"] = min(shouted, 3) / 3
+    return features
+
+
+def _softmax(scores: List[float]) -> List[float]:
+    top = max(scores)
+    exps = [math.exp(s - top) for s in scores]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+class ToneClassifier:
+    """Linear model: one sparse weight vector per tone"""
+
+    def __init__(self, weights: Optional[Dict[str, Dict[str, float]]] = None):
+        self.weights = weights or {tone: {} for tone in TONES}
+
+    def probabilities(self, text: str) -> Dict[str, float]:
+        features = featurize(text)
+        scores = [
+            sum(self.weights[tone].get(name, 0.0) * value for name, value in features.items())
+            for tone in TONES
+        ]
+        return dict(zip(TONES, _softmax(scores)))
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        """Most likely tone and its probability"""
+        probabilities = self.probabilities(text)
+        tone = max(probabilities, key=probabilities.get)
+        return tone, probabilities[tone]
+
+    @classmethod
+    def load(cls, path: str = TONE_MODEL_PATH) -> "ToneClassifier":
+        with open(path) as f:
+            return cls(json.load(f)["weights"])
+
+    def save(self, path: str, metadata: Optional[Dict] = None):
+        with open(path, "w") as f:
+            json.dump({"tones": TONES, "metadata": metadata or {}, "weights": self.weights}, f, indent=1, sort_keys=True)
+            f.write("\n")
+
+
+def train(examples: List[Tuple[str, str]], epochs: int = 60, learning_rate: float = 0.2,
+          l2: float = 1e-2, seed: int = 42) -> ToneClassifier:
+    """Fit by SGD on cross-entropy with L2; tiny weights are pruned to keep the model compact"""
+    rng = random.Random(seed)
+    model = ToneClassifier()
+    data = [(featurize(text), TONES.index(tone)) for text, tone in examples]
+    for _ in range(epochs):
+        rng.shuffle(data)
+        for features, label in data:
+            probabilities = _softmax([
+                sum(model.weights[tone].get(name, 0.0) * value for name, value in features.items())
+                for tone in TONES
+            ])
+            for index, tone in enumerate(TONES):
+                gradient = probabilities[index] - (1.0 if index == label else 0.0)
+                weights = model.weights[tone]
+                for name, value in features.items():
+                    current = weights.get(name, 0.0)
+                    weights[name] = current - learning_rate * (gradient * value + l2 * current)
+    for tone in TONES:
+        model.weights[tone] = {name: round(w, 4) for name, w in model.weights[tone].items() if abs(w) >= 1e-3}
+    return model
+
+
+def _read_examples(path: str) -> List[Tuple[str, str]]:
+    with open(path, newline="") as f:
+        return [(row["text"], row["tone"]) for row in csv.DictReader(f) if row["tone"] in TONES]
+
+
+def _accuracy(model: ToneClassifier, examples: List[Tuple[str, str]]) -> float:
+    if not examples:
+        return 0.0
+    return sum(1 for text, tone in examples if model.classify(text)[0] == tone) / len(examples)
+
+
+def cross_validate(examples: List[Tuple[str, str]], folds: int = 5, epochs: int = 60,
+                   seed: int = 7) -> Dict[str, float]:
+    """
+    Stratified k-fold scores: every example is predicted once by a model that
+    never saw it. Reports accuracy, per-tone recall, and how often a confident
+    prediction (above TONE_CONFIDENCE_THRESHOLD) is still wrong.
+    """
+    rng = random.Random(seed)
+    by_tone: Dict[str, List[Tuple[str, str]]] = {tone: [] for tone in TONES}
+    for example in examples:
+        by_tone[example[1]].append(example)
+    fold_sets: List[List[Tuple[str, str]]] = [[] for _ in range(folds)]
+    for group in by_tone.values():
+        rng.shuffle(group)
+        for i, example in enumerate(group):
+            fold_sets[i % folds].append(example)
+
+    correct, confident, confident_wrong = 0, 0, 0
+    hits = {tone: 0 for tone in TONES}
+    for k in range(folds):
+        held_out = fold_sets[k]
+        model = train([e for i, fold in enumerate(fold_sets) if i != k for e in fold], epochs=epochs)
+        for text, tone in held_out:
+            predicted, probability = model.classify(text)
+            correct += predicted == tone
+            hits[tone] += predicted == tone
+            if probability >= TONE_CONFIDENCE_THRESHOLD:
+                confident += 1
+                confident_wrong += predicted != tone
+    scores = {"folds": folds, "accuracy": round(correct / len(examples), 3)}
+    for tone in TONES:
+        scores[f"recall{tone}"] = round(hits[tone] / len(by_tone[tone]), 3) if by_tone[tone] else None
+    scores["confidentShare"] = round(confident / len(examples), 3)
+    scores["confidentErrorRate"] = round(confident_wrong / confident, 3) if confident else None
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local tone classifier")
+    parser.add_argument("data", help="CSV with text,tone columns")
+    parser.add_argument("-o", "--output", default=TONE_MODEL_PATH)
+    parser.add_argument("--epochs", type=int, default=60)
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds for the reported scores")
+    args = parser.parse_args()
+
+    examples = _read_examples(args.data)
+    validation = cross_validate(examples, folds=args.folds, epochs=args.epochs)
+
+    # Ship a model trained on everything; scores come from the held-out folds
+    model = train(examples, epochs=args.epochs)
+    metadata = {
+        "examples": len(examples),
+        "epochs": args.epochs,
+        "crossValidation": validation,
+        "trainAccuracy": round(_accuracy(model, examples), 3),
+    }
+    model.save(args.output, metadata)
+    print(f"✅ Tone model written to {args.output}: {metadata}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Priority triage queue
+Indexed binary min-heap keyed by request id, so a request's priority can be
+raised or lowered in O(log n) and dispatchers can ask for the top k in
+O(k log k) without sorting every request.
+"""
+
+import heapq
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Statuses still waiting for a dispatcher, most pressing first
+TRIAGE_STATUS_RANK = {"urgent": 0, "open": 1}
+
+
+class IndexedHeap:
+    """Binary min-heap with an id -> position index for decrease/increase-key and removal"""
+
+    def __init__(self):
+        self._heap: List[Tuple[Any, Hashable]] = []
+        self._pos: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._pos
+
+    def key_of(self, item_id: Hashable) -> Any:
+        return self._heap[self._pos[item_id]][0]
+
+    def push(self, item_id: Hashable, key: Any):
+        """Insert an item, or change its key if already present"""
+        if item_id in self._pos:
+            self.update(item_id, key)
+            return
+        self._heap.append((key, item_id))
+        self._pos[item_id] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def update(self, item_id: Hashable, key: Any):
+        """Change an item's key, moving it up or down as needed"""
+        i = self._pos[item_id]
+        old_key = self._heap[i][0]
+        self._heap[i] = (key, item_id)
+        if key < old_key:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def remove(self, item_id: Hashable) -> bool:
+        """Remove an item if present; returns whether it was"""
+        i = self._pos.pop(item_id, None)
+        if i is None:
+            return False
+        last = self._heap.pop()
+        if i < len(self._heap):
+            self._heap[i] = last
+            self._pos[last[1]] = i
+            self._sift_up(i)
+            self._sift_down(self._pos[last[1]])
+        return True
+
+    def peek(self) -> Optional[Tuple[Any, Hashable]]:
+        return self._heap[0] if self._heap else None
+
+    def pop(self) -> Optional[Tuple[Any, Hashable]]:
+        if not self._heap:
+            return None
+        top = self._heap[0]
+        self.remove(top[1])
+        return top
+
+    def top_k(self, k: int) -> List[Tuple[Any, Hashable]]:
+        """Smallest k items in order, without modifying the heap"""
+        result = []
+        if k <= 0 or not self._heap:
+            return result
+        # Frontier of heap positions, itself a small heap ordered by key
+        frontier = [(self._heap[0][0], 0)]
+        while frontier and len(result) < k:
+            _, i = heapq.heappop(frontier)
+            result.append(self._heap[i])
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(self._heap):
+                    heapq.heappush(frontier, (self._heap[child][0], child))
+        return result
+
+    def _swap(self, i: int, j: int):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._pos[heap[i][1]] = i
+        self._pos[heap[j][1]] = j
+
+    def _sift_up(self, i: int):
+        heap = self._heap
+        while i > 0:
+            parent = (i - 1) // 2
+            if heap[i][0] < heap[parent][0]:
+                self._swap(i, parent)
+                i = parent
+            else:
+                break
+
+    def _sift_down(self, i: int):
+        heap = self._heap
+        n = len(heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and heap[child][0] < heap[smallest][0]:
+                    smallest = child
+            if smallest == i:
+                break
+            self._swap(i, smallest)
+            i = smallest
+
+
+def _created_at(request: Dict) -> float:
+    timestamp = request.get("timestamp")
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp).timestamp()
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return datetime.now().timestamp()
+
+
+class TriageQueue:
+    """
+    Requests awaiting dispatch, ordered by safety score (highest first),
+    then status (urgent before open), then waiting time (oldest first).
+    Requests in any other status are kept out of the queue.
+    """
+
+    def __init__(self):
+        self._heap = IndexedHeap()
+        self._requests: Dict[str, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @staticmethod
+    def priority_key(request: Dict) -> Tuple[int, int, float]:
+        return (
+            -(request.get("safetyScore") or 0),
+            TRIAGE_STATUS_RANK.get(request.get("status"), len(TRIAGE_STATUS_RANK)),
+            _created_at(request),
+        )
+
+    def sync(self, request: Dict):
+        """Insert, reprioritise or drop a request to match its current status and score"""
+        request_id = request["id"]
+        if request.get("status") not in TRIAGE_STATUS_RANK:
+            self.discard(request_id)
+            return
+        self._requests[request_id] = request
+        self._heap.push(request_id, self.priority_key(request))
+
+    def discard(self, request_id: str):
+        self._heap.remove(request_id)
+        self._requests.pop(request_id, None)
+
+    def top(self, k: int = 1) -> List[Dict]:
+        return [self._requests[request_id] for _, request_id in self._heap.top_k(k)]
+
+    def claim(self) -> Optional[Dict]:
+        """Remove and return the highest-priority request"""
+        top = self._heap.pop()
+        if top is None:
+            return None
+        return self._requests.pop(top[1])